@@ -1,3 +1,23 @@
 from ._scrape.scrape import scrape
 from ._make_cards import make_cards
 from ._scrape_all import scrape_all
+from ._scrape._fetch.page_cache import PageCache
+from ._scrape.ascrape import ascrape
+from ._ascrape_all import ascrape_all
+from ._scrape._fetch.rate_limit import TokenBucket
+from ._scrape._fetch.rate_limit import AdaptiveRateController
+from ._scrape_dump import scrape_dump
+from ._scrape._fetch.fetchers import LiveFetcher
+from ._scrape._fetch.fetchers import CachedFetcher
+from ._scrape._fetch.fetchers import CassetteFetcher
+from ._scrape._fetch.single_flight import SingleFlightFetcher
+from ._scrape._fetch.negative_cache import NegativeCache
+from ._scrape._fetch.fetchers import SectionFetcher
+from ._scrape._fetch.politeness import Politeness
+from ._scrape_pipeline import scrape_pipeline
+from ._scrape.scrape import scrape_html
+from ._cleanstr.soup import set_html_parser
+from ._scrape._postprocessing.pipeline import set_stage_enabled, is_stage_enabled
+from ._model import Entry, Etymology, PartOfSpeech
+from ._model import Pronunciation, Definition, Example
+from ._model import to_model, to_results
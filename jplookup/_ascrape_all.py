@@ -0,0 +1,236 @@
+"""
+Filename: jplookup._ascrape_all.py
+Author: TravisGK
+Date: 2025-03-22
+
+Description: This file defines the asyncio counterpart of scrape_all(...),
+             which scrapes a list of Japanese terms concurrently
+             while one global token bucket keeps the run polite.
+
+Version: 1.0
+License: MIT
+"""
+
+import asyncio
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from jplookup._scrape.ascrape import ascrape
+from jplookup._scrape._fetch.fetchers import CachedFetcher
+from jplookup._scrape._fetch.rate_limit import AdaptiveRateController
+from jplookup._scrape._fetch.session import DEFAULT_TIMEOUT
+from jplookup._scrape._fetch.single_flight import SingleFlightFetcher
+from jplookup._journal import FOUND, UNFOUND, EXCEPTION
+from jplookup._scrape_all import (
+    load_terms,
+    timestamp,
+    load_previous_run,
+    open_journal,
+    restore_from_journal,
+    save_json,
+    print_progress,
+    finish_run,
+)
+
+
+def _collect_results(terms: list, records: dict, results: dict, times: dict):
+    """
+    Returns the data dict, the scrape timestamps, the unfound terms
+    and the terms that threw exceptions, all in the original order
+    of the <terms>, gathered from the journaled <records>
+    and the <results> (scraped at <times>) of this run.
+    """
+    data = {}
+    scraped_at = {}
+    unfound = []
+    exceptionals = []
+    for term in terms:
+        if restore_from_journal(term, records, data, unfound, scraped_at):
+            continue
+        if term not in results:
+            continue  # not finished yet.
+
+        word_info = results[term]
+        if isinstance(word_info, Exception):
+            exceptionals.append(term)
+        elif word_info and len(word_info) > 0:
+            data[term] = word_info
+            scraped_at[term] = times[term]
+        else:
+            unfound.append(term)
+
+    return data, scraped_at, unfound, exceptionals
+
+
+async def ascrape_all(
+    out_path="jp-data.json",
+    in_path="n5.txt",
+    words=None,
+    requests_per_second=2.0,
+    burst: int = 1,
+    max_concurrency: int = 8,
+    error_sleep_seconds=20,
+    verbose: bool = True,
+    cache=None,
+    timeout=DEFAULT_TIMEOUT,
+    resume: bool = True,
+    checkpoint_every: int = 100,
+    refresh: bool = False,
+    max_age_days=None,
+    negative_cache=None,
+    prequery: bool = False,
+    politeness=None,
+):
+    """
+    Takes either an <in_path> specifying a .txt file to load terms from,
+    or takes a list of <words> directly, then saves the scraped
+    results as a single dictionary to the <out_path> JSON.
+
+    Up to <max_concurrency> terms are looked up at the same time,
+    and all their requests together stay under <requests_per_second>
+    (allowing bursts of up to <burst> requests).
+    The rate is cut back whenever Wiktionary answers with 429/503
+    and recovers while its responses are healthy.
+    The saved results are the same as those of scrape_all(...),
+    with the terms kept in their original order.
+    Lookups that lead to the same page share one fetch and one parse.
+
+    As with scrape_all(...), finished terms are journaled so that
+    an interrupted run can be resumed if <resume> is True,
+    and the <out_path> JSON is saved every <checkpoint_every> terms.
+    If <refresh> is True, only terms that are new, failed last time
+    or were scraped more than <max_age_days> ago are scraped again.
+    A <negative_cache>, <prequery> and <politeness> are used the same way
+    as by scrape_all(...); a Politeness policy replaces
+    <requests_per_second> and <burst>.
+    """
+    terms = load_terms(in_path, words)
+    journal, records = open_journal(out_path, resume)
+    if refresh:
+        records = {**load_previous_run(out_path, max_age_days), **records}
+    to_scrape = [t for t in terms if not restore_from_journal(t, records, {}, [])]
+
+    start_time = time.time()
+    limiter = politeness
+    if limiter is None:
+        limiter = AdaptiveRateController(
+            initial_rate=requests_per_second,
+            max_rate=requests_per_second,
+            burst=burst,
+        )
+    fetcher = CachedFetcher(
+        cache,
+        timeout=timeout,
+        limiter=limiter,
+        pool_size=max_concurrency,
+        negative_cache=negative_cache,
+    )
+
+    # Concurrent lookups of the same page share one fetch and one parse.
+    shared_fetcher = SingleFlightFetcher(fetcher)
+    executor = ThreadPoolExecutor(max_concurrency)
+    # Disk writes are kept in order on one thread of their own,
+    # so that syncing the journal never holds up the event loop.
+    writer = ThreadPoolExecutor(1)
+    num_done = 0
+    results = {}
+    times = {}
+
+    async def write(function, *args, **kwargs):
+        # Runs the given disk write on the writer thread.
+        await asyncio.get_running_loop().run_in_executor(
+            writer,
+            functools.partial(function, *args, **kwargs),
+        )
+
+    async def run(term: str):
+        # Saves the term's results or the exception it threw.
+        nonlocal num_done
+        try:
+            word_info = await ascrape(
+                term,
+                executor=executor,
+                error_sleep_seconds=error_sleep_seconds,
+                verbose=verbose,
+                fetcher=shared_fetcher,
+                as_model=True,
+            )
+        except Exception as e:
+            if verbose:
+                print(
+                    "################################\n"
+                    + f"EXCEPTION {e} from term {term}\n"
+                    + "################################\n"
+                )
+            results[term] = e
+            if journal is not None:
+                await write(journal.append, term, EXCEPTION)
+            return
+
+        num_done += 1
+        results[term] = word_info
+        times[term] = timestamp()
+        if word_info and len(word_info) > 0:
+            if verbose:
+                print_progress(
+                    term,
+                    word_info,
+                    num_done,
+                    len(to_scrape),
+                    start_time,
+                    limiter,
+                )
+            if journal is not None:
+                await write(journal.append, term, FOUND, word_info, times[term])
+        else:
+            if verbose:
+                print(f"No data saved for {term}!")
+            if journal is not None:
+                await write(journal.append, term, UNFOUND, scraped_at=times[term])
+
+        if out_path is not None and num_done % checkpoint_every == 0:
+            data, scraped_at, unfound, exceptionals = _collect_results(
+                terms,
+                records,
+                results,
+                times,
+            )
+            await write(save_json, data, out_path, scraped_at, unfound, exceptionals)
+
+    try:
+        if prequery:
+            await asyncio.get_running_loop().run_in_executor(
+                executor,
+                shared_fetcher.prequery,
+                to_scrape,
+            )
+        await asyncio.gather(*[run(term) for term in to_scrape])
+    finally:
+        # Fetches that are already running are waited on,
+        # so nothing is still using the fetchers or the journal
+        # by the time they're closed.
+        executor.shutdown(wait=True, cancel_futures=True)
+        writer.shutdown(wait=True)
+        shared_fetcher.close()
+        fetcher.close()
+        if journal is not None:
+            journal.close()
+
+    # Collects data into one dictionary in the original order of the terms.
+    data, scraped_at, unfound, exceptionals = _collect_results(
+        terms,
+        records,
+        results,
+        times,
+    )
+
+    return finish_run(
+        data,
+        unfound,
+        exceptionals,
+        out_path,
+        cache,
+        verbose,
+        journal,
+        scraped_at,
+    )
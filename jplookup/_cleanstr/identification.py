@@ -10,8 +10,35 @@ Version: 1.0
 License: MIT
 """
 
+import re
 import jaconv
 
+# Character classes (for regular expressions) of the Japanese characters.
+KANJI_CHARS = "\u4e00-\u9fff"
+KANA_CHARS = "\u3040-\u309f\u30a0-\u30ff"
+JAPANESE_CHARS = KANJI_CHARS + KANA_CHARS
+JAPANESE_PUNCT_CHARS = (
+    "\u3000-\u303f"  # CJK Symbols and Punctuation (includes 、。〆「」 etc.)
+    "\uff01-\uff0f"  # Fullwidth ASCII punctuation (！＂＃ etc.)
+    "\uff1a-\uff1f"  # More fullwidth punctuation (：；？ etc.)
+    "\uff3b-\uff3f"  # Brackets and connectors (［＼］＿ etc.)
+    "\uff5b-\uff60"  # More brackets and symbols ({|}～ etc.)
+    "\uff61-\uff65"  # Halfwidth Katakana punctuation (｡｢｣ etc.)
+)
+
+# Precompiled so that whole strings are searched in one call
+# instead of character by character.
+_KANJI = re.compile(f"[{KANJI_CHARS}]")
+_JAPANESE_PUNCT = re.compile(f"[{JAPANESE_PUNCT_CHARS}]")
+_JAPANESE_RUNS = re.compile(f"[{JAPANESE_CHARS}]+")
+_JAPANESE_PREFIX = re.compile(f"[{JAPANESE_CHARS}]*")
+_JAPANESE_OR_PUNCT_RUNS = re.compile(f"[{JAPANESE_CHARS}{JAPANESE_PUNCT_CHARS}]+")
+_TAG_CONTENTS = re.compile(r"<[^>]*")
+
+# Folds ー, イ and ウ together, since kata_matches(...) lets them stand in
+# for each other.
+_LONG_VOWEL_FOLD = str.maketrans("イウ", "ーー")
+
 
 # Text identification/search functions.
 def is_kanji(char) -> bool:
@@ -36,16 +63,7 @@ def is_kana(char) -> bool:
 
 def is_japanese_punct(char):
     """Returns True if the character is a Japanese punctuation mark."""
-    jp_punc_ranges = [
-        (0x3000, 0x303F),  # CJK Symbols and Punctuation (includes 、。〆「」 etc.)
-        (0xFF01, 0xFF0F),  # Fullwidth ASCII punctuation (！＂＃ etc.)
-        (0xFF1A, 0xFF1F),  # More fullwidth punctuation (：；？ etc.)
-        (0xFF3B, 0xFF3F),  # Brackets and connectors (［＼］＿ etc.)
-        (0xFF5B, 0xFF60),  # More brackets and symbols ({|}～ etc.)
-        (0xFF61, 0xFF65),  # Halfwidth Katakana punctuation (｡｢｣ etc.)
-    ]
-
-    return any(start <= ord(char) <= end for start, end in jp_punc_ranges)
+    return _JAPANESE_PUNCT.fullmatch(char) is not None
 
 
 def is_japanese_char(char) -> bool:
@@ -53,26 +71,34 @@ def is_japanese_char(char) -> bool:
     return is_kanji(char) or is_kana(char)
 
 
+def has_kanji(text: str) -> bool:
+    """Returns True if any char of the given text is Kanji."""
+    return _KANJI.search(text) is not None
+
+
+def find_japanese_runs(text: str) -> list:
+    """
+    Returns every unbroken run of kanji or kana characters
+    in the given text, in order.
+    """
+    return _JAPANESE_RUNS.findall(text)
+
+
+def leading_japanese(text: str) -> str:
+    """Returns the kanji or kana characters at the start of the text."""
+    return _JAPANESE_PREFIX.match(text).group()
+
+
 def percent_japanese(text: str):
     """
     Returns a value from 0.0 to 1.0 indicating
     how many of the characters are Japanese.
     """
-    num_jp = 0
-    total = 0
-    in_tag = False
-    for c in text:
-        if c in "()":
-            pass
-        elif c == "<":
-            in_tag = True
-        elif c == ">":
-            in_tag = False
-        elif not in_tag and (is_japanese_char(c) or is_japanese_punct(c)):
-            num_jp += 1
-            total += 1
-        else:
-            total += 1
+    # Parentheses and the brackets of tags aren't counted at all,
+    # while characters inside tags count only as non-Japanese.
+    total = len(text) - sum(text.count(c) for c in "()<>")
+    outside_tags = _TAG_CONTENTS.sub("", text)
+    num_jp = sum(len(run) for run in _JAPANESE_OR_PUNCT_RUNS.findall(outside_tags))
     return num_jp / total if total > 0 else 0
 
 
@@ -93,29 +119,59 @@ def kata_matches(p_kata: str, t_kata: str) -> bool:
     return True
 
 
-def kana_matches(p_kana: str, t_kana: str) -> bool:
+def long_vowel_key(kata: str) -> str:
     """
-    Returns True if the kana match each other,
-    with the flexibility that a char in <t_kana> can
-    be either い(イ) or う(ウ) and still match with a <p_kana>'s
-    corresponding ー.
+    Returns the <kata> with every イ and ウ written as ー,
+    which is the same for any two katakana that kata_matches(...).
     """
-    if len(p_kana) != len(t_kana):
-        return False
+    return kata.translate(_LONG_VOWEL_FOLD)
+
 
-    p_kata = jaconv.hira2kata(p_kana)
-    t_kata = jaconv.hira2kata(t_kana)
+class PronunciationIndex:
+    """
+    An index of the values of the given (katakana, value) pairs,
+    filed under the long_vowel_key(...) of their katakana.
+
+    Finding the katakana that match another then only compares it
+    against those of the same key rather than against all of them.
+    """
 
-    return kata_matches(p_kata, t_kata)
+    def __init__(self, items):
+        self._buckets = {}
+        for kata, value in items:
+            self._buckets.setdefault(long_vowel_key(kata), []).append((kata, value))
 
+    @classmethod
+    def of_bank(cls, pronunciation_bank: dict):
+        """
+        Returns the index of a dict mapping kana to pronunciation dictionaries,
+        with each kana converted to katakana once.
+        """
+        return cls((jaconv.hira2kata(k), v) for k, v in pronunciation_bank.items())
+
+    def candidates(self, kata: str) -> list:
+        """
+        Returns the (katakana, value) pairs, in the order they were given,
+        of every kana that could match the given <kata>.
+        """
+        return self._buckets.get(long_vowel_key(kata), [])
+
+
+def find_pronunciation_match(pronunciation_bank, transcription: dict):
+    """
+    Returns the matching pronunciation dictionary or None.
+    The <pronunciation_bank> is either a dict mapping kana
+    to pronunciation dictionaries or a PronunciationIndex of it.
+    """
+    if not isinstance(pronunciation_bank, PronunciationIndex):
+        pronunciation_bank = PronunciationIndex.of_bank(pronunciation_bank)
 
-def find_pronunciation_match(pronunciation_bank: dict, transcription: dict):
-    """Returns the matching pronunciation dictionary or None."""
+    t_kata = jaconv.hira2kata(transcription["kana"])
     return next(
         (
             v
-            for k, v in pronunciation_bank.items()
-            if kana_matches(k, transcription["kana"])
+            for p_kata, v in pronunciation_bank.candidates(t_kata)
+            if kata_matches(p_kata, t_kata)
         ),
         None,
     )
@@ -3,7 +3,7 @@ Filename: jplookup._cleanstr.removal.py
 Author: TravisGK
 Date: 2025-03-22
 
-Description: This file defines functions for 
+Description: This file defines functions for
              removing specific parts of HTML.
 
 Version: 1.0
@@ -11,7 +11,29 @@ License: MIT
 """
 
 import re
-from bs4 import BeautifulSoup
+from collections.abc import MutableMapping
+from bs4 import BeautifulSoup, NavigableString
+
+# The whitespace that the parser collapses when it makes up a whole text,
+# except inside the tags that preserve whitespace.
+ASCII_SPACES = "\x20\x0a\x09\x0c\x0d"
+PRESERVE_WHITESPACE_TAGS = ["pre", "textarea"]
+
+FURTHER_PRONUNCIATIONS_KEY = ">Further pronunciations</div>"
+
+# Opening tags (allowing for quoted attributes with ">" in them)
+# and closing tags of the elements that prune_html(...) cuts out.
+_TAG_PATTERNS = {
+    name: re.compile(
+        rf"<{name}\b((?:[^>\"']|\"[^\"]*\"|'[^']*')*)>|</{name}\s*>",
+        re.IGNORECASE,
+    )
+    for name in ["div", "table"]
+}
+_CLASS_ATTRIBUTE = re.compile(
+    r"(?:^|\s)class\s*=\s*(?:\"([^\"]*)\"|'([^']*)'|([^\s\"'>]+))",
+    re.IGNORECASE,
+)
 
 
 # Text removal functions.
@@ -41,36 +63,140 @@ def shorten_html(html: str) -> str:
     return html
 
 
+def prune_html(html: str) -> str:
+    """
+    Returns the HTML with the blocks that are never used
+    ('Further pronunciations' and kanji tables) cut out as text,
+    so that BeautifulSoup doesn't have to build them at all.
+    Blocks whose end can't be found are left in.
+    """
+    html = _cut_elements(
+        html,
+        "div",
+        lambda classes: "NavFrame" in classes.split(),
+        FURTHER_PRONUNCIATIONS_KEY,
+    )
+    html = _cut_elements(
+        html,
+        "table",
+        lambda classes: " ".join(classes.split()) == "wikitable kanji-table",
+    )
+    return html
+
+
+def _cut_elements(html: str, name: str, is_match, key=None) -> str:
+    # Cuts out every <name> element whose class attribute satisfies
+    # <is_match> (and which contains the <key>, if given).
+    pattern = _TAG_PATTERNS[name]
+    pieces = []
+    index = 0
+    for tag in pattern.finditer(html):
+        if tag.start() < index or tag.group(0)[1] == "/":
+            continue  # inside an element that was cut, or a closing tag.
+
+        class_attribute = _CLASS_ATTRIBUTE.search(tag.group(1))
+        if class_attribute is None or not is_match(
+            next(c for c in class_attribute.groups() if c is not None)
+        ):
+            continue
+
+        # Finds the closing tag that matches, counting nested elements.
+        depth = 0
+        end = None
+        for inner_tag in pattern.finditer(html, tag.start()):
+            if inner_tag.group(0)[1] == "/":
+                depth -= 1
+            elif not inner_tag.group(0).endswith("/>"):
+                depth += 1
+            if depth == 0:
+                end = inner_tag.end()
+                break
+
+        if end is not None and (key is None or key in html[tag.start() : end]):
+            pieces.append(_collapse_edges(html[index : tag.start()], index > 0, True))
+            index = end
+
+    pieces.append(_collapse_edges(html[index:], index > 0, False))
+    return "".join(pieces)
+
+
+def _collapse_edges(html: str, at_start: bool, at_end: bool) -> str:
+    # Collapses the whitespace-only text at the start and/or end of the <html>
+    # (next to an element that was cut) the way the parser would have
+    # before the element was removed.
+    def collapse(text: str) -> str:
+        if text == "" or text.strip(ASCII_SPACES) != "":
+            return text
+        return "\n" if "\n" in text else " "
+
+    if at_start:
+        i = html.find("<")
+        i = len(html) if i < 0 else i
+        html = collapse(html[:i]) + html[i:]
+    if at_end:
+        i = html.rfind(">") + 1
+        html = html[:i] + collapse(html[i:])
+    return html
+
+
 def remove_tags(html: str, omissions: list = []) -> str:
     """Returns the given text with all HTML tags removed."""
+    if "<" not in html and "&" not in html and html.strip(ASCII_SPACES) != "":
+        # Without any tags or entities, the parser would only escape the ">"s.
+        return html.replace(">", "&gt;")
 
+    # html.parser is kept for snippets since lxml would wrap them
+    # in <html> and <body> tags.
     soup = BeautifulSoup(html, "html.parser")
-    for tag in soup.find_all(True):
-        if tag.name not in omissions:
-            tag.unwrap()
-
+    unwrap_tags(soup, omissions)
     return str(soup)
 
 
-def remove_further_pronunciations(html: str) -> str:
+def unwrap_tags(tag, omissions: list = []):
     """
-    Returns the HTML with any 'Further pronunciations' removed entirely.
+    Unwraps every tag inside the given <tag> (in place)
+    except for those named in <omissions>.
     """
-    KEY = ">Further pronunciations</div>"
-    soup = BeautifulSoup(html, "html.parser")
+    for inner_tag in tag.find_all(True):
+        if inner_tag.name not in omissions:
+            inner_tag.unwrap()
 
+
+def settle_strings(tag):
+    """
+    Joins the texts inside the given <tag> that were left next to each other
+    (by unwrapping or removing tags) and collapses the ones made up
+    of only whitespace, leaving the <tag> the same as parsing
+    its HTML again would.
+    """
+    tag.smooth()
+    for string in tag.find_all(string=True):
+        if (
+            type(string) is NavigableString
+            and string != ""
+            and string.strip(ASCII_SPACES) == ""
+            and string.find_parent(PRESERVE_WHITESPACE_TAGS) is None
+        ):
+            string.replace_with("\n" if "\n" in string else " ")
+
+
+def decompose_further_pronunciations(soup) -> bool:
+    """
+    Removes any 'Further pronunciations' from the <soup> (in place),
+    returning True if any were found.
+    """
+    found = False
     further_ps = soup.find_all("div", class_="NavFrame")
     for p in further_ps:
-        if KEY in str(p):
+        if FURTHER_PRONUNCIATIONS_KEY in str(p):
             p.decompose()
+            found = True
 
-    return str(soup)
-
+    return found
 
-def remove_unwanted_html(html: str) -> str:
-    """Returns text with <ul> tags and pesky <span> tags removed."""
-    soup = BeautifulSoup(html, "html.parser")
 
+def decompose_unwanted_html(soup):
+    """Removes <ul> tags and pesky <span> tags from the <soup> (in place)."""
     TAGS = ["ul", "cite"]
 
     for tag in TAGS:
@@ -89,15 +215,13 @@ def remove_unwanted_html(html: str) -> str:
     for obj in soup.find_all("li", class_="mw-empty-elt"):
         obj.unwrap()
 
-    return str(soup)
-
 
 def remove_alternative_spellings(data):
     """
     Recursively removes all 'alternative-spellings'
     keys from nested dictionaries and lists and returns the result.
     """
-    if isinstance(data, dict):
+    if isinstance(data, MutableMapping):
         # Removes the key if it exists.
         data.pop("alternative-spellings", None)
 
@@ -0,0 +1,105 @@
+"""
+Filename: jplookup._cleanstr.soup.py
+Author: TravisGK
+Date: 2025-03-22
+
+Description: This file defines the function that every Wiktionary page
+             is parsed into BeautifulSoup with, along with the switch
+             between the parser backends it can use:
+
+             - "html.parser" is Python's own (slow) parser
+               and is always available.
+             - "lxml" is the C-accelerated parser of the lxml package,
+               which is several times faster if it's installed.
+
+             The parsing of pages relies on the line number (sourceline)
+             that every tag was found on, which BeautifulSoup only records
+             for "html.parser", so the lxml backend builds its soup
+             from lxml's own tree in order to keep those line numbers.
+
+Version: 1.0
+License: MIT
+"""
+
+import os
+from bs4 import BeautifulSoup
+
+try:
+    from lxml import etree
+    from bs4.builder._lxml import LXMLTreeBuilder
+except ImportError:
+    etree = None
+    LXMLTreeBuilder = object
+
+HTML_PARSERS = ("html.parser", "lxml")
+
+# The backend is kept in the environment so that it's used
+# by worker processes as well.
+_ENV_KEY = "JPLOOKUP_HTML_PARSER"
+
+
+def set_html_parser(name: str):
+    """
+    Sets the backend that Wiktionary pages are parsed with
+    ("html.parser" or "lxml") for this process
+    and any processes it starts afterward.
+    """
+    if name not in HTML_PARSERS:
+        raise ValueError(f"Unknown HTML parser {name}; expected one of {HTML_PARSERS}.")
+    if name == "lxml" and etree is None:
+        raise ImportError("The lxml HTML parser needs the lxml package installed.")
+    os.environ[_ENV_KEY] = name
+
+
+def get_html_parser() -> str:
+    """Returns the name of the backend that Wiktionary pages are parsed with."""
+    name = os.environ.get(_ENV_KEY, "html.parser")
+    return "html.parser" if name == "lxml" and etree is None else name
+
+
+def make_soup(html: str) -> BeautifulSoup:
+    """
+    Returns the BeautifulSoup of the given <html>
+    made by the current backend, where every tag has its sourceline.
+    """
+    if get_html_parser() == "lxml":
+        return BeautifulSoup(html, builder=_LineNumberedLXMLTreeBuilder())
+    return BeautifulSoup(html, "html.parser")
+
+
+class _LineNumberedLXMLTreeBuilder(LXMLTreeBuilder):
+    # Parses the markup into an lxml tree first, then builds the soup
+    # from it tag by tag, giving each tag the line lxml found it on.
+    def feed(self, markup):
+        parser = etree.HTMLParser(huge_tree=True)
+        root = etree.fromstring(markup, parser)
+        if root is None:
+            return  # there was nothing to parse.
+
+        docinfo = root.getroottree().docinfo
+        if docinfo.doctype:
+            self.doctype(docinfo.root_name, docinfo.public_id, docinfo.system_url)
+        self._build(root)
+
+    def _build(self, element):
+        soup = self.soup
+        if element.tag is etree.Comment:
+            self.comment(element.text or "")
+        elif isinstance(element.tag, str):
+            # HTML has no namespaces, so the soup is given each tag directly.
+            soup.handle_starttag(
+                element.tag,
+                None,
+                None,
+                dict(element.attrib),
+                sourceline=element.sourceline,
+            )
+            if element.text:
+                soup.handle_data(element.text)
+            for child in element:
+                self._build(child)
+            soup.endData()
+            soup.handle_endtag(element.tag)
+
+        if element.tail:
+            soup.handle_data(element.tail)
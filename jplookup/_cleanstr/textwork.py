@@ -3,7 +3,7 @@ Filename: jplookup._cleanstr.textwork.py
 Author: TravisGK
 Date: 2025-03-22
 
-Description: This file defines functions for 
+Description: This file defines functions for
              extracting text from within HTML
              and replacing text.
 
@@ -11,9 +11,18 @@ Version: 1.0
 License: MIT
 """
 
-from bs4 import BeautifulSoup
+import re
 import jaconv
-from .identification import is_kanji, is_japanese_char, is_japanese_punct
+from bs4 import BeautifulSoup
+from .identification import (
+    JAPANESE_CHARS,
+    JAPANESE_PUNCT_CHARS,
+    find_japanese_runs,
+    is_kanji,
+)
+
+# The only characters separate_term_and_furigana(...) looks at.
+_FURIGANA_TOKENS = re.compile(f"[(){JAPANESE_CHARS}{JAPANESE_PUNCT_CHARS}]")
 
 
 # Extraction functions.
@@ -22,8 +31,26 @@ def extract_tag_contents(html: str, tag: str) -> list:
     Returns all text contained inside
     the specified tag types (parents tags only).
     """
+    # Snippets stay on html.parser (as in remove_tags(...)),
+    # since lxml would rearrange the tags of a partial snippet.
     soup = BeautifulSoup(html, "html.parser")
-    return [str(t) for t in soup.find_all(tag) if t.find_parent(tag) is None]
+    return [str(t) for t in find_outer_tags(soup, tag)]
+
+
+def find_outer_tags(root, tag: str) -> list:
+    """
+    Returns the elements of the specified tag type inside the <root> element
+    that aren't inside another one of them (parents tags only).
+    """
+    outer_tags = []
+    for t in root.find_all(tag):
+        parent = t.parent
+        while parent is not None and parent is not root and parent.name != tag:
+            parent = parent.parent
+        if parent is None or parent is root:
+            outer_tags.append(t)
+
+    return outer_tags
 
 
 def separate_term_and_furigana(word: str):
@@ -39,18 +66,17 @@ def separate_term_and_furigana(word: str):
     inside_furi = False
     uses_furi = False
 
-    for i, c in enumerate(word):
+    for c in _FURIGANA_TOKENS.findall(word):
         if c == "(":
             uses_furi = True
             inside_furi = True
         elif c == ")":
             inside_furi = False
-        elif is_japanese_char(c) or is_japanese_punct(c):
-            if inside_furi:
-                furi[-1].append(c)
-            else:
-                furi.append([])
-                term += c
+        elif inside_furi:
+            furi[-1].append(c)
+        else:
+            furi.append([])
+            term += c
 
     # Identifies stretches of pure kanji.
     if uses_furi:
@@ -110,21 +136,7 @@ def extract_japanese(subline: str) -> list:
     Returns a list of every individual japanese phrase
     contained in the given text.
     """
-    in_jp = False
-    terms = [
-        "",
-    ]
-    for i, c in enumerate(subline):
-        if is_japanese_char(c):
-            terms[-1] += c
-            in_jp = True
-
-        elif in_jp:  # not a jp char
-            terms.append("")
-            in_jp = False
-
-    terms = [t for t in terms if len(t) > 0]
-    return terms
+    return find_japanese_runs(subline)
 
 
 def extract_pronunciation_info(p_str: str):
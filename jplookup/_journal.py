@@ -0,0 +1,90 @@
+"""
+Filename: jplookup._journal.py
+Author: TravisGK
+Date: 2025-03-22
+
+Description: This file defines an append-only JSONL journal
+             which scrape_all(...) writes every finished term to,
+             so that a run that crashes or gets interrupted
+             can pick up where it left off.
+
+Version: 1.0
+License: MIT
+"""
+
+import json
+import os
+from jplookup._model import dumps_json
+
+# The statuses a term can be journaled with.
+FOUND = "found"
+UNFOUND = "unfound"
+EXCEPTION = "exception"
+
+
+class Journal:
+    """
+    An append-only file with one JSON record per finished term.
+    Each record is flushed and synced to disk as soon as it's written.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    def load(self) -> dict:
+        """
+        Returns a dict mapping each journaled term to its latest record.
+        A record left half-written by a crash is ignored.
+        """
+        records = {}
+        if not os.path.exists(self.path):
+            return records
+
+        with open(self.path, "r", encoding="utf-8", errors="replace") as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # the tail end of an interrupted write.
+                records[record["term"]] = record
+
+        return records
+
+    def append(self, term: str, status: str, data=None, scraped_at=None):
+        """
+        Durably appends the outcome of scraping the given <term>,
+        along with the ISO timestamp of when it was scraped.
+        """
+        if self._file is None:
+            cut_off = False
+            if os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+                with open(self.path, "rb") as file:
+                    file.seek(-1, os.SEEK_END)
+                    cut_off = file.read(1) != b"\n"
+
+            self._file = open(self.path, "a", encoding="utf-8")
+            if cut_off:
+                # Starts a fresh line since the last write was cut off.
+                self._file.write("\n")
+
+        record = {
+            "term": term,
+            "status": status,
+            "data": data,
+            "scraped-at": scraped_at,
+        }
+        self._file.write(dumps_json(record) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def remove(self):
+        """Deletes the journal once its contents have been compacted."""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -13,6 +13,7 @@ License: MIT
 
 import json
 import jplookup.anki
+from jplookup._model import to_model
 
 
 def make_cards(
@@ -52,7 +53,7 @@ def make_cards(
                 continue  # if debugging, only debug terms aren't skipped.
 
             anki_card = jplookup.anki.dict_to_anki_fields(
-                word_data, include_romanji=True
+                to_model(word_data), include_romanji=True
             )
             if anki_card is None:
                 if verbose:
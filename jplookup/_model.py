@@ -0,0 +1,238 @@
+"""
+Filename: jplookup._model.py
+Author: TravisGK
+Date: 2025-03-22
+
+Description: This file defines a compact model of the results
+             of jplookup.scrape(...), which the scraping runs hold
+             their finished terms in instead of nested dicts.
+
+             - Entry maps Etymology names to Etymologies.
+             - Etymology maps Part of Speech names to PartsOfSpeech.
+             - PartOfSpeech, Pronunciation, Definition and Example
+               keep their values in __slots__ rather than in a dict each.
+
+             Every class can still be used like the dict it stands in for
+             (such as pronunciation["pitch-accent"]), keys included in the
+             order they were set, so the postprocessing and anki functions
+             work on it directly and it's written out to the same JSON.
+             Nothing is turned back into dicts until to_dict() is called
+             or the model is written out with write_json(...).
+
+Version: 1.0
+License: MIT
+"""
+
+import json
+import sys
+from collections.abc import MutableMapping
+
+# Every order of keys that records have, so that records with
+# the same keys in the same order share one tuple of them.
+_KEY_ORDERS = {}
+
+
+def _slot_name(key: str) -> str:
+    return key.replace("-", "_")
+
+
+def _key_order(keys: tuple) -> tuple:
+    return _KEY_ORDERS.setdefault(keys, keys)
+
+
+class _Record(MutableMapping):
+    """
+    A dict-like record whose keys are limited to its <KEYS>,
+    each one kept in a slot of the same name (with "_" for "-").
+    Like a dict, its keys are iterated in the order they were set,
+    which is kept as a tuple of the keys it has.
+    """
+
+    __slots__ = ("_keys",)
+    KEYS = ()
+
+    # Maps each key that holds records to the class of those records.
+    CHILDREN = {}
+
+    def __init__(self, data=()):
+        self._keys = ()
+        for key, value in dict(data).items():
+            self[key] = value
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        """Returns the record of the given dict (and of any dicts in it)."""
+        record = cls()
+        for key, value in data.items():
+            child_class = cls.CHILDREN.get(key)
+            if child_class is not None:
+                if isinstance(value, list):
+                    value = [child_class.from_dict(v) for v in value]
+                elif isinstance(value, dict):
+                    value = child_class.from_dict(value)
+            record[key] = value
+        return record
+
+    def to_dict(self) -> dict:
+        """Returns the record (and any records in it) as dicts."""
+        return {key: _to_plain(value) for key, value in self.items()}
+
+    def __getitem__(self, key):
+        if key not in self._keys:
+            raise KeyError(key)
+        return getattr(self, _slot_name(key))
+
+    def __setitem__(self, key, value):
+        if key not in self.KEYS:
+            raise KeyError(f"{type(self).__name__} has no key {key}.")
+        setattr(self, _slot_name(key), value)
+        if key not in self._keys:
+            self._keys = _key_order(self._keys + (key,))
+
+    def __delitem__(self, key):
+        if key not in self._keys:
+            raise KeyError(key)
+        delattr(self, _slot_name(key))
+        self._keys = _key_order(tuple(k for k in self._keys if k != key))
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class Example(_Record):
+    """An example sentence of a Definition."""
+
+    KEYS = ("japanese", "romanji", "english")
+    __slots__ = tuple(_slot_name(key) for key in KEYS)
+
+
+class Definition(_Record):
+    """A Definition of a Part of Speech along with its examples."""
+
+    KEYS = ("definition", "synonyms", "antonyms", "examples")
+    __slots__ = tuple(_slot_name(key) for key in KEYS)
+    CHILDREN = {"examples": Example}
+
+
+class Pronunciation(_Record):
+    """A kana transcription of a term and its phonetic information."""
+
+    KEYS = (
+        "kana",
+        "furigana",
+        "furigana-by-index",
+        "region",
+        "pitch-accent",
+        "ipa",
+    )
+    __slots__ = tuple(_slot_name(key) for key in KEYS)
+
+
+class PartOfSpeech(_Record):
+    """
+    The word information of a Part of Speech.
+    (The anki module swaps its "pronunciations" for the one "pronunciation"
+    that a card is made with.)
+    """
+
+    KEYS = (
+        "term",
+        "counter",
+        "pronunciation",
+        "pronunciations",
+        "definitions",
+        "usage-notes",
+    )
+    __slots__ = tuple(_slot_name(key) for key in KEYS)
+    CHILDREN = {
+        "pronunciation": Pronunciation,
+        "pronunciations": Pronunciation,
+        "definitions": Definition,
+    }
+
+
+class _NamedRecords(dict):
+    """
+    A dict of records under names that many entries share
+    (such as "Etymology 1" or "Noun"), which are interned
+    so that every entry points to the same strings.
+    """
+
+    __slots__ = ()
+    CHILD = None
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        """Returns the given dict with its values as records."""
+        records = cls()
+        for name, value in data.items():
+            if isinstance(value, dict):
+                value = cls.CHILD.from_dict(value)
+            records[sys.intern(name)] = value
+        return records
+
+    def to_dict(self) -> dict:
+        """Returns the records as dicts."""
+        return {name: _to_plain(value) for name, value in self.items()}
+
+
+class Etymology(_NamedRecords):
+    """Maps the names of the Parts of Speech of an Etymology to them."""
+
+    __slots__ = ()
+    CHILD = PartOfSpeech
+
+
+class Entry(_NamedRecords):
+    """Maps the names of the Etymologies of an entry to them."""
+
+    __slots__ = ()
+    CHILD = Etymology
+
+
+def _to_plain(value):
+    # Returns the value with any records in it turned back into dicts.
+    if isinstance(value, (_Record, _NamedRecords)):
+        return value.to_dict()
+    if isinstance(value, list):
+        return [_to_plain(v) for v in value]
+    return value
+
+
+def to_model(results: list) -> list:
+    """Returns the results of scrape(...) as a list of Entries."""
+    return [
+        entry if isinstance(entry, Entry) else Entry.from_dict(entry)
+        for entry in results
+    ]
+
+
+def to_results(entries: list) -> list:
+    """Returns the list of Entries as the dicts scrape(...) returns."""
+    return [_to_plain(entry) for entry in entries]
+
+
+def _json_default(obj):
+    # Lets json write out records one at a time as it reaches them.
+    if isinstance(obj, _Record):
+        return dict(obj.items())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def write_json(obj, json_file, indent=4):
+    """
+    Writes the <obj> to the open <json_file>,
+    turning each record into a dict only as it's written out.
+    """
+    json.dump(obj, json_file, ensure_ascii=False, indent=indent, default=_json_default)
+
+
+def dumps_json(obj, indent=None) -> str:
+    """Returns the <obj> as a JSON string, the same way write_json(...) writes it."""
+    return json.dumps(obj, ensure_ascii=False, indent=indent, default=_json_default)
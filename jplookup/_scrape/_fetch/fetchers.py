@@ -0,0 +1,402 @@
+"""
+Filename: jplookup._scrape._fetch.fetchers.py
+Author: TravisGK
+Date: 2025-03-22
+
+Description: This file defines the fetchers that scrape(...) gets
+             its Wiktionary pages from. Any of them can be given to
+             scrape(...) or scrape_all(...), and it's used by every
+             recursive call as well.
+
+             - LiveFetcher requests pages from Wiktionary.
+             - CachedFetcher goes through a PageCache first.
+             - SectionFetcher requests only the Japanese section of each
+               page through the MediaWiki parse API.
+             - PrefetchedFetcher only serves pages it has been given,
+               asking for any others by raising PagesNeeded.
+             - ResolverFetcher gets pages from a callback, such as one
+               that reads them from a dump or from files.
+             - CassetteFetcher replays pages recorded to a local directory,
+               so the whole parsing pipeline can be rerun offline
+               with exactly the same pages (for benchmarks and
+               regression checks). If it's given another fetcher,
+               pages missing from the directory are fetched and recorded.
+
+Version: 1.0
+License: MIT
+"""
+
+import json
+import os
+import re
+from .http import (
+    WIKTIONARY_URL,
+    WIKTIONARY_API_URL,
+    Page,
+    fetch_page,
+    fetch_section,
+    query_titles,
+)
+from .negative_cache import NegativeCache
+from .page_cache import normalize_title
+from .session import DEFAULT_TIMEOUT, create_session
+
+# Characters that can't be used in file names on every OS.
+_UNSAFE_CHARS = re.compile(r'[<>:"/\\|?*%\x00-\x1f]')
+
+# Statuses worth recording; anything else is a temporary problem.
+_RECORDED_STATUS_CODES = (200, 404)
+
+# What the cache keys of Japanese sections start with, so that they're
+# never mistaken for the full pages cached under the plain titles.
+SECTION_KEY_PREFIX = "section:"
+
+
+class Fetcher:
+    """
+    The interface of a page source:
+    fetch(<term>) returns the Page of the term's Wiktionary entry.
+    """
+
+    # The rate limiter the fetcher paces its requests with (if any).
+    limiter = None
+
+    # The SingleFlight that scrape(...) shares parsed results through (if any).
+    parses = None
+
+    # The NegativeCache of missing pages and dictionary forms (if any).
+    negative_cache = None
+
+    def fetch(self, term: str) -> Page:
+        raise NotImplementedError
+
+    def prequery(self, titles: list) -> dict:
+        """
+        Looks up ahead of time which of the <titles> exist
+        and where they redirect, so that missing pages are never requested.
+        Returns a dict mapping each redirected title to its target.
+        """
+        return {}
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class LiveFetcher(Fetcher):
+    """
+    Requests pages from Wiktionary through the given pooled <session>,
+    or through its own session of <pool_size> connections if None.
+    If a <limiter> is given, every request takes a token from it.
+    If a <negative_cache> is given, pages known to be missing aren't requested.
+    Pages are requested from <url> followed by the term,
+    and the MediaWiki API at <api_url> is used for prequery(...).
+    If <stream>, each download stops once the Japanese section has arrived.
+    """
+
+    def __init__(
+        self,
+        session=None,
+        timeout=DEFAULT_TIMEOUT,
+        limiter=None,
+        pool_size: int = 10,
+        negative_cache=None,
+        url: str = WIKTIONARY_URL,
+        api_url: str = WIKTIONARY_API_URL,
+        stream: bool = False,
+    ):
+        self._owns_session = session is None
+        self.session = self._create_session(pool_size) if session is None else session
+        self.timeout = timeout
+        self.limiter = limiter
+        self.negative_cache = negative_cache
+        self.url = url
+        self.api_url = api_url
+        self.stream = stream
+        self.redirects = {}
+        self._owns_negative_cache = False
+
+    def _create_session(self, pool_size: int):
+        return create_session(pool_size)
+
+    def resolve(self, term: str) -> str:
+        """Returns the title that the <term> is known to redirect to."""
+        return self.redirects.get(normalize_title(term), term)
+
+    def prequery(self, titles: list) -> dict:
+        info = query_titles(
+            titles,
+            session=self.session,
+            timeout=self.timeout,
+            limiter=self.limiter,
+            api_url=self.api_url,
+        )
+        if self.negative_cache is None and len(info.missing) > 0:
+            # Remembers the missing pages for this run only.
+            self.negative_cache = NegativeCache(":memory:", ttl_seconds=None)
+            self._owns_negative_cache = True
+        for title in info.missing:
+            self.negative_cache.add_missing(title)
+
+        redirects = {normalize_title(a): t for a, t in info.redirects.items()}
+        self.redirects.update(redirects)
+        return redirects
+
+    def fetch(self, term: str) -> Page:
+        return fetch_page(
+            self.resolve(term),
+            session=self.session,
+            timeout=self.timeout,
+            limiter=self.limiter,
+            negative_cache=self.negative_cache,
+            url=self.url,
+            stream=self.stream,
+        )
+
+    def close(self):
+        if self._owns_session and self.session is not None:
+            self.session.close()
+        if self._owns_negative_cache:
+            self.negative_cache.close()
+
+
+class CachedFetcher(LiveFetcher):
+    """
+    Reads pages from the given PageCache, requesting (and saving)
+    only the pages that are missing or stale.
+    If <offline>, no requests are made (nor is a session opened)
+    and missing pages count as 404s.
+    """
+
+    def __init__(
+        self,
+        cache,
+        session=None,
+        timeout=DEFAULT_TIMEOUT,
+        limiter=None,
+        offline: bool = False,
+        pool_size: int = 10,
+        negative_cache=None,
+        url: str = WIKTIONARY_URL,
+        api_url: str = WIKTIONARY_API_URL,
+        stream: bool = False,
+    ):
+        self.offline = offline
+        super().__init__(
+            session,
+            timeout,
+            limiter,
+            pool_size,
+            negative_cache,
+            url,
+            api_url,
+            stream,
+        )
+        self.cache = cache
+
+    def _create_session(self, pool_size: int):
+        return None if self.offline else super()._create_session(pool_size)
+
+    def prequery(self, titles: list) -> dict:
+        if self.offline:
+            return {}  # nothing can be looked up without a request.
+        return super().prequery(titles)
+
+    def fetch(self, term: str) -> Page:
+        return fetch_page(
+            self.resolve(term),
+            cache=self.cache,
+            session=self.session,
+            timeout=self.timeout,
+            limiter=self.limiter,
+            offline=self.offline,
+            negative_cache=self.negative_cache,
+            url=self.url,
+            stream=self.stream,
+        )
+
+
+class SectionFetcher(CachedFetcher):
+    """
+    Requests only the rendered Japanese section of each page
+    through the MediaWiki parse API at <api_url>,
+    which saves most of the download (and parsing) of pages
+    with many languages, such as 一 or 生.
+
+    If the API can't give the section, the full page is fetched instead.
+    The sections are saved to the <cache> (if given) under their titles
+    with SECTION_KEY_PREFIX in front, so the same cache can also hold
+    the full pages of other fetchers.
+    """
+
+    def __init__(
+        self,
+        cache=None,
+        session=None,
+        timeout=DEFAULT_TIMEOUT,
+        limiter=None,
+        pool_size: int = 10,
+        negative_cache=None,
+        url: str = WIKTIONARY_URL,
+        api_url: str = WIKTIONARY_API_URL,
+    ):
+        super().__init__(
+            cache,
+            session,
+            timeout,
+            limiter,
+            pool_size=pool_size,
+            negative_cache=negative_cache,
+            url=url,
+            api_url=api_url,
+        )
+
+    def fetch(self, term: str) -> Page:
+        term = self.resolve(term)
+        if self.negative_cache is not None and self.negative_cache.is_missing(term):
+            self.negative_cache.record("missing")
+            return Page(404, "")
+
+        key = SECTION_KEY_PREFIX + term
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None and self.cache.is_fresh(cached):
+                self.cache.record("hits")
+                return Page(200, cached.text)
+
+        page = fetch_section(
+            term,
+            session=self.session,
+            timeout=self.timeout,
+            limiter=self.limiter,
+            api_url=self.api_url,
+        )
+        if page is None:
+            return super().fetch(term)  # falls back on the full page.
+
+        if self.cache is not None and page.status_code == 200:
+            self.cache.record("misses")
+            self.cache.put(key, page.text)
+        if self.negative_cache is not None and page.status_code == 404:
+            self.negative_cache.add_missing(term)
+
+        return page
+
+
+class CassetteFetcher(Fetcher):
+    """
+    Replays pages recorded as JSON files in the given <directory>.
+
+    If a <fetcher> is given, pages that haven't been recorded yet
+    are fetched with it and recorded (only 200s and 404s are kept).
+    Otherwise, pages that haven't been recorded count as 404s.
+    Closing the cassette closes its <fetcher> too.
+    """
+
+    def __init__(self, directory: str, fetcher=None):
+        self.directory = directory
+        self.fetcher = fetcher
+        os.makedirs(directory, exist_ok=True)
+
+    @property
+    def limiter(self):
+        return None if self.fetcher is None else self.fetcher.limiter
+
+    @property
+    def negative_cache(self):
+        return None if self.fetcher is None else self.fetcher.negative_cache
+
+    def prequery(self, titles: list) -> dict:
+        return {} if self.fetcher is None else self.fetcher.prequery(titles)
+
+    def path_of(self, term: str) -> str:
+        """Returns the path of the file the <term>'s page is recorded to."""
+        name = _UNSAFE_CHARS.sub(
+            lambda m: f"%{ord(m.group(0)):02X}",
+            normalize_title(term),
+        )
+        return os.path.join(self.directory, name + ".json")
+
+    def fetch(self, term: str) -> Page:
+        path = self.path_of(term)
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as file:
+                recorded = json.load(file)
+            return Page(recorded["status-code"], recorded["text"])
+
+        if self.fetcher is None:
+            return Page(404, "")
+
+        page = self.fetcher.fetch(term)
+        if page.status_code in _RECORDED_STATUS_CODES:
+            recorded = {
+                "term": term,
+                "status-code": page.status_code,
+                "text": page.text,
+            }
+            with open(path + ".tmp", "w", encoding="utf-8") as file:
+                json.dump(recorded, file, ensure_ascii=False)
+            os.replace(path + ".tmp", path)
+
+        return page
+
+    def close(self):
+        if self.fetcher is not None:
+            self.fetcher.close()
+
+
+class PagesNeeded(Exception):
+    """Raised when the pages of the given <titles> haven't been fetched yet."""
+
+    def __init__(self, titles: list):
+        super().__init__(f"Pages needed: {', '.join(titles)}")
+        self.titles = titles
+
+
+class PrefetchedFetcher(Fetcher):
+    """
+    Serves only the pages in the given dict, which maps
+    normalized titles to (status code, text) tuples.
+    Asking for any other page raises PagesNeeded.
+
+    This lets the parsing of a term run apart from the fetching
+    of its pages (such as in another process).
+    """
+
+    def __init__(self, pages: dict):
+        self.pages = pages
+
+    def fetch(self, term: str) -> Page:
+        key = normalize_title(term)
+        if key not in self.pages:
+            raise PagesNeeded([term])
+        return Page(*self.pages[key])
+
+
+class ResolverFetcher(Fetcher):
+    """
+    Gets the HTML of each page by calling <resolver>(title),
+    which returns None if there's no such page.
+    Each title is only resolved once; <pages> can map titles
+    to HTML that is already known. If <resolver> is None,
+    every page not in <pages> counts as missing.
+    """
+
+    def __init__(self, resolver=None, pages=None):
+        self.resolver = resolver
+        self.pages = {}
+        for title, html in (pages or {}).items():
+            self.pages[normalize_title(title)] = html
+
+    def fetch(self, term: str) -> Page:
+        key = normalize_title(term)
+        if key not in self.pages:
+            self.pages[key] = None if self.resolver is None else self.resolver(term)
+
+        html = self.pages[key]
+        return Page(404, "") if html is None else Page(200, html)
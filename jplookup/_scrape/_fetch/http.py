@@ -0,0 +1,364 @@
+"""
+Filename: jplookup._scrape._fetch.http.py
+Author: TravisGK
+Date: 2025-03-22
+
+Description: This file defines the function that retrieves the HTML
+             of a Wiktionary page, going through a PageCache first
+             if one is given and reusing a pooled session's connections.
+
+             Pages can also be streamed, in which case the download
+             stops as soon as the Japanese section has arrived.
+
+             It also defines a function that retrieves only the Japanese
+             section of a page through the MediaWiki parse API,
+             which is much smaller for pages with many languages,
+             and a function that looks up whether many titles exist
+             (and where they redirect) with a few batched API requests.
+
+Version: 1.0
+License: MIT
+"""
+
+from collections import namedtuple
+import requests
+from .rate_limit import THROTTLE_STATUS_CODES
+from .session import DEFAULT_TIMEOUT
+
+WIKTIONARY_URL = "https://en.wiktionary.org/wiki/"
+WIKTIONARY_API_URL = "https://en.wiktionary.org/w/api.php"
+HEADERS = {"User-Agent": "Mozilla/5.0"}
+
+# The parts of a response that the scraper uses.
+Page = namedtuple("Page", ["status_code", "text", "retry_after"], defaults=[None])
+
+# What a batch of title queries found out:
+# the set of missing titles and a dict mapping titles to their redirect targets.
+TitleInfo = namedtuple("TitleInfo", ["missing", "redirects"])
+
+# The most titles the MediaWiki API accepts in one query.
+MAX_TITLES_PER_QUERY = 50
+
+# The markers that shorten_html(...) cuts the Japanese section out by.
+_JP_HEADER = b'id="Japanese">Japanese</h'
+_SECTION_DIV = b'<div class="mw-heading mw-heading2">'
+_STREAM_CHUNK_SIZE = 16 * 1024
+
+
+def _read_japanese_section(response) -> str:
+    """
+    Returns the Japanese section of the streamed <response>'s page,
+    wrapped the same way as shorten_html(...) wraps it, reading only
+    as far as the next language header and closing the connection there.
+    Bytes are only decoded once they're known to be part of the section.
+
+    If the page has no Japanese section, the text of what's left
+    is returned, which shorten_html(...) leaves as it is.
+    """
+    WRAPPER_START = "<!DOCTYPE html>\n<html>\n<body>\n"
+    WRAPPER_END = "</body>\n</html>"
+    encoding = response.encoding or "utf-8"
+
+    buffer = bytearray()
+    header_found = False
+    needs_whole_page = False
+    search_start = 0
+    try:
+        for chunk in response.iter_content(_STREAM_CHUNK_SIZE):
+            buffer += chunk
+            if needs_whole_page:
+                continue
+
+            if not header_found:
+                header_index = buffer.find(_JP_HEADER, search_start)
+                end = len(buffer) if header_index < 0 else header_index
+                div_index = buffer.rfind(_SECTION_DIV, 0, end)
+                if div_index > 0:
+                    # Everything before the latest header div is dropped.
+                    del buffer[:div_index]
+                    if header_index >= 0:
+                        header_index -= div_index
+
+                if header_index < 0:
+                    search_start = max(0, len(buffer) - len(_JP_HEADER))
+                    continue
+                if div_index < 0:
+                    # Without a header div the page can't be shortened,
+                    # so all of it is kept.
+                    needs_whole_page = True
+                    continue
+
+                header_found = True
+                search_start = header_index
+
+            next_div_index = buffer.find(_SECTION_DIV, search_start)
+            if next_div_index >= 0:
+                html = bytes(buffer[:next_div_index]).decode(encoding, "replace")
+                return WRAPPER_START + html + WRAPPER_END
+            search_start = max(0, len(buffer) - len(_SECTION_DIV))
+    finally:
+        response.close()
+
+    # The Japanese section (if any) runs to the end of the page.
+    html = bytes(buffer).decode(encoding, "replace")
+    if header_found:
+        return WRAPPER_START + html + WRAPPER_END
+    return html
+
+
+def fetch_page(
+    term: str,
+    cache=None,
+    session=None,
+    timeout=DEFAULT_TIMEOUT,
+    limiter=None,
+    offline: bool = False,
+    negative_cache=None,
+    url: str = WIKTIONARY_URL,
+    stream: bool = False,
+) -> Page:
+    """
+    Returns the Page for the Wiktionary entry of the given <term>.
+
+    The request is made through <session> if one is given,
+    otherwise a one-off connection is opened. If a <limiter> is given,
+    a token is taken from it before any request is sent
+    and it's told how Wiktionary responded.
+
+    If a <cache> is given, fresh cached pages are returned without
+    any request being made, and stale cached pages are revalidated
+    using their ETag/Last-Modified headers.
+
+    If <offline>, no request is ever made; pages missing from
+    the <cache> are treated as pages that don't exist.
+
+    If a NegativeCache is given, pages it knows to be missing
+    are answered with a 404 straight away, and new 404s are recorded to it.
+
+    If <stream>, the page is downloaded bit by bit and the connection
+    is closed once its Japanese section has arrived; the text is then
+    only that section (which is also all that gets cached).
+    """
+    if negative_cache is not None and negative_cache.is_missing(term):
+        negative_cache.record("missing")
+        return Page(404, "")
+
+    cached = cache.get(term) if cache is not None else None
+    if cached is not None and (offline or cache.is_fresh(cached)):
+        cache.record("hits")
+        return Page(200, cached.text)
+
+    if offline:
+        if cache is not None:
+            cache.record("misses")
+        return Page(404, "")
+
+    headers = dict(HEADERS)
+    if cached is not None:
+        cache.record("stale")
+        if cached.etag:
+            headers["If-None-Match"] = cached.etag
+        if cached.last_modified:
+            headers["If-Modified-Since"] = cached.last_modified
+    elif cache is not None:
+        cache.record("misses")
+
+    if limiter is not None:
+        limiter.acquire()
+
+    get = session.get if session is not None else requests.get
+    try:
+        response = get(url + term, headers=headers, timeout=timeout, stream=stream)
+    finally:
+        if limiter is not None:
+            limiter.release()
+    if limiter is not None:
+        limiter.report(response.status_code, response.headers.get("Retry-After"))
+    if negative_cache is not None and response.status_code == 404:
+        negative_cache.add_missing(term)
+
+    if stream and response.status_code == 200:
+        text = _read_japanese_section(response)
+    else:
+        text = response.text
+
+    if cache is not None:
+        if response.status_code == 304 and cached is not None:
+            # The page hasn't changed since it was cached.
+            cache.record("revalidated")
+            cache.touch(term)
+            return Page(200, cached.text)
+
+        if response.status_code == 200:
+            cache.put(
+                term,
+                text,
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+            )
+
+    return Page(
+        response.status_code,
+        text,
+        response.headers.get("Retry-After"),
+    )
+
+
+def _get_api(api_url: str, params: dict, session, timeout, limiter):
+    """
+    Returns the response of a MediaWiki API request,
+    taking a token from the <limiter> first if one is given.
+    """
+    if limiter is not None:
+        limiter.acquire()
+
+    get = session.get if session is not None else requests.get
+    try:
+        response = get(api_url, params=params, headers=HEADERS, timeout=timeout)
+    finally:
+        if limiter is not None:
+            limiter.release()
+    if limiter is not None:
+        limiter.report(response.status_code, response.headers.get("Retry-After"))
+
+    return response
+
+
+def fetch_section(
+    term: str,
+    session=None,
+    timeout=DEFAULT_TIMEOUT,
+    limiter=None,
+    api_url: str = WIKTIONARY_API_URL,
+    language: str = "Japanese",
+):
+    """
+    Returns the Page holding only the rendered <language> section
+    of the Wiktionary entry of the given <term>, using the parse API
+    at <api_url>: one small request finds the index of the section
+    and another renders just that section.
+
+    A 404 Page is returned if the entry doesn't exist
+    and a Page with no text if it has no <language> section.
+    None is returned if the API couldn't give the section,
+    in which case the full page should be fetched instead.
+    """
+    params = {
+        "action": "parse",
+        "page": term,
+        "redirects": 1,
+        "format": "json",
+        "formatversion": 2,
+    }
+
+    # Finds which section holds the language.
+    response = _get_api(
+        api_url,
+        {**params, "prop": "sections"},
+        session,
+        timeout,
+        limiter,
+    )
+    if response.status_code in THROTTLE_STATUS_CODES:
+        return Page(response.status_code, "", response.headers.get("Retry-After"))
+    if response.status_code != 200:
+        return None
+
+    try:
+        data = response.json()
+    except ValueError:
+        return None
+    if "error" in data:
+        if data["error"].get("code") == "missingtitle":
+            return Page(404, "")
+        return None
+
+    section_index = None
+    for section in data.get("parse", {}).get("sections", []):
+        if str(section.get("level")) == "2" and section.get("line") == language:
+            section_index = str(section.get("index", ""))
+            break
+
+    if section_index is None:
+        return Page(200, "")
+    if not section_index.isdigit():
+        return None  # the section comes from another page.
+
+    # Renders only that section.
+    response = _get_api(
+        api_url,
+        {**params, "prop": "text", "section": section_index},
+        session,
+        timeout,
+        limiter,
+    )
+    if response.status_code in THROTTLE_STATUS_CODES:
+        return Page(response.status_code, "", response.headers.get("Retry-After"))
+    if response.status_code != 200:
+        return None
+
+    try:
+        text = response.json()["parse"]["text"]
+    except (ValueError, KeyError):
+        return None
+    if isinstance(text, dict):
+        text = text.get("*", "")  # formatversion 1.
+
+    return Page(200, text)
+
+
+def query_titles(
+    titles: list,
+    session=None,
+    timeout=DEFAULT_TIMEOUT,
+    limiter=None,
+    api_url: str = WIKTIONARY_API_URL,
+) -> TitleInfo:
+    """
+    Returns the TitleInfo of the given <titles>, found with
+    MediaWiki action=query requests of up to 50 titles each.
+
+    Titles that redirect or are normalized to another title are mapped
+    to the title of the page they end up at. A batch whose request fails
+    is skipped, so its titles are simply fetched as usual.
+    """
+    missing = set()
+    redirects = {}
+
+    # A title with "|" can't be queried along with others.
+    titles = [t for t in dict.fromkeys(titles) if "|" not in t]
+    for i in range(0, len(titles), MAX_TITLES_PER_QUERY):
+        batch = titles[i : i + MAX_TITLES_PER_QUERY]
+        params = {
+            "action": "query",
+            "titles": "|".join(batch),
+            "redirects": 1,
+            "format": "json",
+            "formatversion": 2,
+        }
+        response = _get_api(api_url, params, session, timeout, limiter)
+        if response.status_code != 200:
+            continue
+
+        try:
+            query = response.json().get("query", {})
+        except ValueError:
+            continue
+
+        normalized = {n["from"]: n["to"] for n in query.get("normalized", [])}
+        redirected = {r["from"]: r["to"] for r in query.get("redirects", [])}
+        missing_pages = {
+            page["title"]
+            for page in query.get("pages", [])
+            if page.get("missing") or page.get("invalid")
+        }
+
+        for title in batch:
+            target = normalized.get(title, title)
+            target = redirected.get(target, target)
+            if target in missing_pages:
+                missing.add(title)
+            elif target != title:
+                redirects[title] = target
+
+    return TitleInfo(missing, redirects)
@@ -0,0 +1,116 @@
+"""
+Filename: jplookup._scrape._fetch.negative_cache.py
+Author: TravisGK
+Date: 2025-03-22
+
+Description: This file defines a persistent cache of failed lookups,
+             stored in a single SQLite file: the titles that Wiktionary
+             has no page for, and the conjugated terms that had to fall back
+             on their dictionary form.
+
+             Later runs skip the known-missing pages straight away
+             and go straight to the dictionary form of known conjugations,
+             instead of paying for the same failures again.
+
+Version: 1.0
+License: MIT
+"""
+
+import sqlite3
+import threading
+import time
+from .page_cache import normalize_title
+
+
+class NegativeCache:
+    """
+    A persistent cache of missing pages and dictionary-form fallbacks.
+
+    Parameters:
+        path (str): the path of the SQLite file that holds the records.
+        ttl_seconds (float): how long a record is trusted
+                             before the lookup is tried again.
+                             If None, records never expire.
+    """
+
+    def __init__(
+        self,
+        path: str = "jp-negative-cache.sqlite3",
+        ttl_seconds=30 * 24 * 3600,
+    ):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.stats = {"missing": 0, "dictionary-forms": 0}
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS missing_pages ("
+                "title TEXT PRIMARY KEY, "
+                "recorded_at REAL NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS dictionary_forms ("
+                "term TEXT PRIMARY KEY, "
+                "dictionary_form TEXT NOT NULL, "
+                "recorded_at REAL NOT NULL)"
+            )
+
+    def _oldest_trusted(self) -> float:
+        # Records from before this time have expired.
+        return 0.0 if self.ttl_seconds is None else time.time() - self.ttl_seconds
+
+    def is_missing(self, title: str) -> bool:
+        """Returns True if Wiktionary is known to have no page for the title."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT 1 FROM missing_pages WHERE title = ? AND recorded_at >= ?",
+                (normalize_title(title), self._oldest_trusted()),
+            ).fetchone()
+
+        return row is not None
+
+    def record(self, stat_name: str):
+        """Counts a page that was answered as missing without a request."""
+        with self._lock:
+            self.stats[stat_name] += 1
+
+    def add_missing(self, title: str):
+        """Records that Wiktionary answered with a 404 for the title."""
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO missing_pages (title, recorded_at) "
+                "VALUES (?, ?)",
+                (normalize_title(title), time.time()),
+            )
+
+    def get_dictionary_form(self, term: str):
+        """
+        Returns the dictionary form that the given conjugated <term>
+        was resolved to, or None.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT dictionary_form FROM dictionary_forms "
+                "WHERE term = ? AND recorded_at >= ?",
+                (normalize_title(term), self._oldest_trusted()),
+            ).fetchone()
+            if row is not None:
+                self.stats["dictionary-forms"] += 1
+
+        return None if row is None else row[0]
+
+    def add_dictionary_form(self, term: str, dictionary_form: str):
+        """Records that the <term> is looked up through its <dictionary_form>."""
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO dictionary_forms "
+                "(term, dictionary_form, recorded_at) VALUES (?, ?, ?)",
+                (normalize_title(term), dictionary_form, time.time()),
+            )
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,163 @@
+"""
+Filename: jplookup._scrape._fetch.page_cache.py
+Author: TravisGK
+Date: 2025-03-22
+
+Description: This file defines a persistent on-disk cache for Wiktionary
+             pages, stored in a single SQLite file and keyed by the
+             normalized page title.
+
+             Cached pages are served directly while they're younger than
+             the cache's TTL; once stale, the stored ETag/Last-Modified
+             values are used to revalidate the page with Wiktionary
+             so that unchanged pages don't need to be downloaded again.
+
+Version: 1.0
+License: MIT
+"""
+
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import namedtuple
+
+CachedPage = namedtuple(
+    "CachedPage",
+    ["title", "text", "etag", "last_modified", "fetched_at"],
+)
+
+
+def normalize_title(title: str) -> str:
+    """
+    Returns the given page title in the form Wiktionary uses for its URLs,
+    so that differently written forms of a title share one cache entry.
+    """
+    return unicodedata.normalize("NFC", title).strip().replace(" ", "_")
+
+
+class PageCache:
+    """
+    A persistent cache of Wiktionary HTML pages.
+
+    Parameters:
+        path (str): the path of the SQLite file that holds the pages.
+        ttl_seconds (float): how long a cached page is served without
+                             being revalidated. If None, pages never expire.
+    """
+
+    def __init__(self, path: str = "jp-cache.sqlite3", ttl_seconds=7 * 24 * 3600):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.stats = {"hits": 0, "misses": 0, "stale": 0, "revalidated": 0}
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS pages ("
+                "title TEXT PRIMARY KEY, "
+                "text TEXT NOT NULL, "
+                "etag TEXT, "
+                "last_modified TEXT, "
+                "fetched_at REAL NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS aliases ("
+                "alias TEXT PRIMARY KEY, "
+                "title TEXT NOT NULL)"
+            )
+
+    def get(self, title: str):
+        """
+        Returns the CachedPage for the given title or None.
+        If no page has the title, a redirect alias of it is followed.
+        """
+        key = normalize_title(title)
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT title, text, etag, last_modified, fetched_at "
+                "FROM pages WHERE title = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                row = self._connection.execute(
+                    "SELECT pages.title, text, etag, last_modified, fetched_at "
+                    "FROM aliases JOIN pages ON aliases.title = pages.title "
+                    "WHERE alias = ?",
+                    (key,),
+                ).fetchone()
+
+        return None if row is None else CachedPage(*row)
+
+    def is_fresh(self, page: CachedPage) -> bool:
+        """Returns True if the given cached page hasn't outlived the TTL."""
+        if self.ttl_seconds is None:
+            return True
+        return time.time() - page.fetched_at < self.ttl_seconds
+
+    def put(self, title: str, text: str, etag=None, last_modified=None):
+        """Saves the HTML of a successfully fetched page."""
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO pages "
+                "(title, text, etag, last_modified, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (normalize_title(title), text, etag, last_modified, time.time()),
+            )
+
+    def put_many(self, pages):
+        """
+        Saves every (title, text) pair of the given iterable
+        in a single transaction.
+        """
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO pages "
+                "(title, text, etag, last_modified, fetched_at) "
+                "VALUES (?, ?, NULL, NULL, ?)",
+                [(normalize_title(title), text, now) for title, text in pages],
+            )
+
+    def put_aliases(self, aliases):
+        """
+        Saves every (alias, title) pair of the given iterable,
+        so that looking up the alias (a redirect) gives the page of the title.
+        """
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO aliases (alias, title) VALUES (?, ?)",
+                [(normalize_title(a), normalize_title(t)) for a, t in aliases],
+            )
+
+    def touch(self, title: str):
+        """
+        Marks a cached page as freshly fetched;
+        this is used after Wiktionary says the page hasn't changed.
+        """
+        with self._lock, self._connection:
+            self._connection.execute(
+                "UPDATE pages SET fetched_at = ? WHERE title = ?",
+                (time.time(), normalize_title(title)),
+            )
+
+    def record(self, stat_name: str):
+        """Counts a hit, miss, stale page or revalidation."""
+        with self._lock:
+            self.stats[stat_name] += 1
+
+    def titles(self) -> list:
+        """Returns the titles of every cached page."""
+        with self._lock:
+            rows = self._connection.execute("SELECT title FROM pages").fetchall()
+        return [row[0] for row in rows]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
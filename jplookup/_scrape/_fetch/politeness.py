@@ -0,0 +1,302 @@
+"""
+Filename: jplookup._scrape._fetch.politeness.py
+Author: TravisGK
+Date: 2025-03-22
+
+Description: This file defines the Politeness policy, a single object
+             that holds every rule for how hard Wiktionary gets hit:
+             the most requests per second, bursts, random jitter,
+             backing off when throttled and the most requests at once.
+
+             It can be given anywhere a limiter is accepted and shared
+             by any number of threads and recursive lookups.
+             If it's given a <path>, its request budget is kept in
+             a SQLite file, so several processes (or several programs)
+             on one machine share one budget as well. Without one,
+             the budget is moved to a temporary file the first time
+             the policy is sent to another process.
+
+Version: 1.0
+License: MIT
+"""
+
+import atexit
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from .rate_limit import (
+    THROTTLE_STATUS_CODES,
+    AdaptiveRateController,
+    parse_retry_after,
+)
+
+
+class SharedRateController(AdaptiveRateController):
+    """
+    An AdaptiveRateController whose state is kept in the SQLite file
+    at <path>, so that every process using the same file
+    draws from (and backs off) one shared budget.
+
+    A budget that no process has drawn from for <idle_seconds>
+    is left over from an earlier run, so it starts over
+    at <initial_rate> with a full bucket (though a Retry-After pause
+    that is still in force is kept). If <reset>, the budget
+    starts over no matter what, pause included.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        initial_rate: float = 1.0,
+        min_rate: float = 0.05,
+        max_rate: float = 5.0,
+        increase: float = 0.1,
+        decrease_factor: float = 0.5,
+        burst: int = 1,
+        reset: bool = False,
+        idle_seconds: float = 60.0,
+    ):
+        super().__init__(
+            initial_rate,
+            min_rate,
+            max_rate,
+            increase,
+            decrease_factor,
+            burst,
+        )
+        self.path = path
+        self._connection = None
+        self._pid = None
+        with self._transaction() as connection:
+            row = connection.execute(
+                "SELECT updated, blocked_until FROM bucket"
+            ).fetchone()
+            now = time.time()
+            if row is None or reset or now - row[0] > idle_seconds:
+                blocked_until = 0.0
+                if row is not None and not reset and row[1] > now:
+                    blocked_until = row[1]
+                connection.execute(
+                    "INSERT OR REPLACE INTO bucket "
+                    "(id, tokens, updated, blocked_until, rate) "
+                    "VALUES (0, ?, ?, ?, ?)",
+                    (float(burst), now, blocked_until, initial_rate),
+                )
+
+    def __getstate__(self):
+        # The lock and connection are remade by each process.
+        state = self.__dict__.copy()
+        state["_lock"] = None
+        state["_connection"] = None
+        state["_pid"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        # Returns this process's connection to the SQLite file.
+        if self._connection is None or self._pid != os.getpid():
+            self._connection = sqlite3.connect(
+                self.path,
+                timeout=60,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS bucket ("
+                "id INTEGER PRIMARY KEY CHECK (id = 0), "
+                "tokens REAL NOT NULL, "
+                "updated REAL NOT NULL, "
+                "blocked_until REAL NOT NULL, "
+                "rate REAL NOT NULL)"
+            )
+            self._pid = os.getpid()
+        return self._connection
+
+    def _transaction(self):
+        return _Transaction(self)
+
+    @property
+    def current_rate(self) -> float:
+        with self._transaction() as connection:
+            return connection.execute("SELECT rate FROM bucket").fetchone()[0]
+
+    def acquire(self):
+        """Blocks until a token of the shared bucket is available and takes it."""
+        while True:
+            with self._transaction() as connection:
+                tokens, updated, blocked_until, rate = connection.execute(
+                    "SELECT tokens, updated, blocked_until, rate FROM bucket"
+                ).fetchone()
+                now = time.time()
+                tokens = min(self.burst, tokens + (now - updated) * rate)
+                if now < blocked_until:
+                    wait_seconds = blocked_until - now
+                elif tokens >= 1:
+                    tokens -= 1
+                    wait_seconds = 0
+                else:
+                    wait_seconds = (1 - tokens) / rate
+                connection.execute(
+                    "UPDATE bucket SET tokens = ?, updated = ?",
+                    (tokens, now),
+                )
+
+            if wait_seconds == 0:
+                return
+            time.sleep(wait_seconds)
+
+    def report(self, status_code: int, retry_after=None):
+        with self._transaction() as connection:
+            rate, blocked_until = connection.execute(
+                "SELECT rate, blocked_until FROM bucket"
+            ).fetchone()
+            if status_code in THROTTLE_STATUS_CODES:
+                rate = max(self.min_rate, rate * self.decrease_factor)
+                pause_seconds = parse_retry_after(retry_after)
+                if pause_seconds is not None:
+                    blocked_until = max(blocked_until, time.time() + pause_seconds)
+                    connection.execute("UPDATE bucket SET tokens = 0")
+            elif status_code < 500:
+                rate = min(self.max_rate, rate + self.increase)
+            connection.execute(
+                "UPDATE bucket SET rate = ?, blocked_until = ?",
+                (rate, blocked_until),
+            )
+
+
+class _Transaction:
+    # Holds the SQLite file's write lock for the duration of a with-block.
+    def __init__(self, controller: SharedRateController):
+        self.controller = controller
+
+    def __enter__(self):
+        self.controller._lock.acquire()
+        connection = self.controller._connect()
+        connection.execute("BEGIN IMMEDIATE")
+        return connection
+
+    def __exit__(self, exc_type, *exc_info):
+        connection = self.controller._connection
+        try:
+            connection.execute("ROLLBACK" if exc_type is not None else "COMMIT")
+        finally:
+            self.controller._lock.release()
+
+
+class Politeness:
+    """
+    One policy for how politely Wiktionary is scraped,
+    usable anywhere a limiter is accepted.
+
+    Parameters:
+        max_requests_per_second (float): the most requests per second;
+                                         requests start at this rate.
+        burst (int): how many requests can be sent back to back.
+        jitter (float): a random extra wait of up to this fraction
+                        of the time between two requests at the most
+                        requests per second.
+        backoff_factor (float): what the rate is multiplied by
+                                whenever Wiktionary answers with 429/503
+                                (any Retry-After is honored as well).
+        recovery (float): how many requests per second the rate
+                          goes back up by after every healthy response.
+        min_requests_per_second (float): the lowest the rate backs off to.
+        max_concurrency (int): the most requests waiting on Wiktionary
+                               at the same time (per process).
+        path (str): if given, the request budget is kept in this SQLite file
+                    and shared by every process that uses the same file.
+        reset (bool): if True, the budget in the <path> starts over
+                      even if other processes are drawing from it.
+    """
+
+    def __init__(
+        self,
+        max_requests_per_second: float = 2.0,
+        burst: int = 1,
+        jitter: float = 0.25,
+        backoff_factor: float = 0.5,
+        recovery: float = 0.1,
+        min_requests_per_second: float = 0.05,
+        max_concurrency: int = 8,
+        path=None,
+        reset: bool = False,
+    ):
+        self.jitter = jitter
+        self.max_concurrency = max_concurrency
+        self.path = path
+
+        self._bucket_kwargs = kwargs = {
+            "initial_rate": max_requests_per_second,
+            "min_rate": min_requests_per_second,
+            "max_rate": max_requests_per_second,
+            "increase": recovery,
+            "decrease_factor": backoff_factor,
+            "burst": burst,
+        }
+        if path is None:
+            self.bucket = AdaptiveRateController(**kwargs)
+        else:
+            self.bucket = SharedRateController(path, reset=reset, **kwargs)
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+
+    def _share_bucket(self):
+        # Moves the budget to a temporary SQLite file (which is deleted
+        # when this process exits), so that the processes this policy
+        # is sent to share it with this one.
+        with self._lock:
+            if self.path is not None:
+                return
+            directory = tempfile.mkdtemp(prefix="jplookup-politeness-")
+            atexit.register(shutil.rmtree, directory, ignore_errors=True)
+            kwargs = {
+                **self._bucket_kwargs,
+                "initial_rate": self.bucket.current_rate,
+            }
+            path = os.path.join(directory, "budget.sqlite3")
+            self.bucket = SharedRateController(path, reset=True, **kwargs)
+            self.path = path
+
+    def __getstate__(self):
+        self._share_bucket()
+        state = self.__dict__.copy()
+        del state["_slots"]
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        self._lock = threading.Lock()
+
+    @property
+    def current_rate(self) -> float:
+        """Returns the current number of allowed requests per second."""
+        return self.bucket.current_rate
+
+    def acquire(self):
+        """Blocks until a request is allowed to be sent."""
+        self._slots.acquire()
+        try:
+            self.bucket.acquire()
+            if self.jitter > 0:
+                time.sleep(random.uniform(0, self.jitter / self.bucket.max_rate))
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self):
+        """Frees the slot of a request that has finished."""
+        self._slots.release()
+
+    def report(self, status_code: int, retry_after=None):
+        """Tells the policy how Wiktionary responded to a request."""
+        self.bucket.report(status_code, retry_after)
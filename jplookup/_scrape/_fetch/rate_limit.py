@@ -0,0 +1,152 @@
+"""
+Filename: jplookup._scrape._fetch.rate_limit.py
+Author: TravisGK
+Date: 2025-03-22
+
+Description: This file defines a thread-safe token bucket that keeps
+             every request made to Wiktionary under one shared
+             requests-per-second ceiling, no matter how many lookups
+             are running at the same time.
+
+             It also defines an adaptive version of the bucket that
+             speeds up additively while Wiktionary responds normally
+             and slows down multiplicatively when it answers with
+             429/503 (honoring any Retry-After it gives).
+
+Version: 1.0
+License: MIT
+"""
+
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+# Statuses with which Wiktionary tells the program to slow down.
+THROTTLE_STATUS_CODES = (429, 503)
+
+
+def parse_retry_after(value):
+    """
+    Returns the number of seconds given by a Retry-After header,
+    which can either be a number of seconds or an HTTP date.
+    None is returned if it can't be read.
+    """
+    if value is None:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_time = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_time.timestamp() - time.time())
+
+
+class TokenBucket:
+    """
+    A token bucket that refills at <rate> tokens per second
+    and holds at most <burst> tokens.
+
+    Each request to Wiktionary takes one token;
+    if the bucket is empty, acquire() blocks until a token refills.
+    """
+
+    def __init__(self, rate: float = 2.0, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(
+            self.burst,
+            self._tokens + (now - self._updated) * self.rate,
+        )
+        self._updated = now
+
+    def acquire(self):
+        """Blocks until a token is available and takes it."""
+        while True:
+            with self._lock:
+                self._refill()
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    wait_seconds = self._blocked_until - now
+                elif self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                else:
+                    wait_seconds = (1 - self._tokens) / self.rate
+            time.sleep(wait_seconds)
+
+    def release(self):
+        """
+        Tells the bucket that a request it let through has finished
+        (whether or not it got a response).
+        """
+        pass
+
+    def report(self, status_code: int, retry_after=None):
+        """
+        Tells the bucket how Wiktionary responded to a request.
+        A plain bucket only honors Retry-After on a 429/503.
+        """
+        if status_code in THROTTLE_STATUS_CODES:
+            self._pause(parse_retry_after(retry_after))
+
+    def _pause(self, seconds):
+        # Stops handing out tokens for the given number of seconds.
+        if seconds is None:
+            return
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+
+
+class AdaptiveRateController(TokenBucket):
+    """
+    A token bucket whose rate is adjusted with AIMD
+    (additive increase, multiplicative decrease).
+
+    Every healthy response raises the rate by <increase> requests per second
+    up to <max_rate>; every 429/503 multiplies the rate by <decrease_factor>
+    down to <min_rate> and pauses all requests for the Retry-After period.
+    """
+
+    def __init__(
+        self,
+        initial_rate: float = 1.0,
+        min_rate: float = 0.05,
+        max_rate: float = 5.0,
+        increase: float = 0.1,
+        decrease_factor: float = 0.5,
+        burst: int = 1,
+    ):
+        super().__init__(rate=initial_rate, burst=burst)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+
+    @property
+    def current_rate(self) -> float:
+        """Returns the current number of allowed requests per second."""
+        return self.rate
+
+    def report(self, status_code: int, retry_after=None):
+        if status_code in THROTTLE_STATUS_CODES:
+            with self._lock:
+                self._refill()
+                self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+            self._pause(parse_retry_after(retry_after))
+        elif status_code < 500:
+            with self._lock:
+                self._refill()
+                self.rate = min(self.max_rate, self.rate + self.increase)
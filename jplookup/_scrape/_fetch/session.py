@@ -0,0 +1,33 @@
+"""
+Filename: jplookup._scrape._fetch.session.py
+Author: TravisGK
+Date: 2025-03-22
+
+Description: This file defines a function that creates the pooled
+             keep-alive HTTP session which is shared by a scrape(...)
+             call, all of its recursive calls and by scrape_all(...),
+             so that connections to Wiktionary (and their TLS handshakes)
+             are reused instead of being opened for every page.
+
+Version: 1.0
+License: MIT
+"""
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# (connect timeout, read timeout) in seconds.
+DEFAULT_TIMEOUT = (10, 30)
+
+
+def create_session(pool_size: int = 10) -> requests.Session:
+    """
+    Returns a requests.Session that keeps up to <pool_size>
+    connections alive per host.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"User-Agent": "Mozilla/5.0"})
+    return session
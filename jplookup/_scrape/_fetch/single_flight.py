@@ -0,0 +1,142 @@
+"""
+Filename: jplookup._scrape._fetch.single_flight.py
+Author: TravisGK
+Date: 2025-03-22
+
+Description: This file defines a single-flight memo, which makes sure
+             that concurrent calls for the same key share one call
+             and that finished results are reused for the rest of the run.
+
+             It's used by SingleFlightFetcher so that pages which many
+             terms lead to (e.g. 撮る, 取る and 捕る all leading to とる)
+             are only fetched and parsed once.
+
+Version: 1.0
+License: MIT
+"""
+
+import threading
+from collections import OrderedDict
+from .fetchers import Fetcher
+from .http import Page
+from .page_cache import normalize_title
+
+# Statuses of pages that won't change during a run.
+_MEMOIZED_STATUS_CODES = (200, 404)
+
+
+class _Flight:
+    # A call in progress that other threads can wait on.
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    A thread-safe memo of results keyed by any hashable key.
+    If <max_size> is given, only that many of the most recently
+    used results are kept.
+    """
+
+    def __init__(self, max_size=None):
+        self.max_size = max_size
+        self.stats = {"calls": 0, "shared": 0}
+        self._results = OrderedDict()
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn, keep=None):
+        """
+        Returns the result of calling <fn>() for the given <key>.
+        If the result for the key is memoized or is already being made
+        by another thread, that result is returned instead.
+        Results are only memoized if <keep>(result) is True (or <keep> is None),
+        and exceptions are raised to every caller but never memoized.
+        """
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                self.stats["shared"] += 1
+                return self._results[key]
+
+            flight = self._flights.get(key)
+            is_leader = flight is None
+            if is_leader:
+                flight = _Flight()
+                self._flights[key] = flight
+                self.stats["calls"] += 1
+            else:
+                self.stats["shared"] += 1
+
+        if not is_leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = fn()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+                if flight.error is None and (keep is None or keep(flight.value)):
+                    self._results[key] = flight.value
+                    if self.max_size is not None and len(self._results) > self.max_size:
+                        self._results.popitem(last=False)
+            flight.done.set()
+
+        return flight.value
+
+    def clear(self):
+        with self._lock:
+            self._results.clear()
+
+
+class SingleFlightFetcher(Fetcher):
+    """
+    Wraps another <fetcher> so that concurrent requests for the same page
+    share one fetch and finished pages (200s and 404s) are reused,
+    keeping up to <max_pages> of them.
+
+    It also lets scrape(...) share the parsed results of the pages
+    that terms lead to through <parses>, keeping up to <max_parses> of them,
+    so a page that many terms lead to is only parsed once per run.
+    Closing it only clears its memos; the wrapped <fetcher> is left open.
+    """
+
+    def __init__(self, fetcher, max_pages: int = 256, max_parses: int = 256):
+        self.fetcher = fetcher
+        self.pages = SingleFlight(max_size=max_pages)
+        self.parses = SingleFlight(max_size=max_parses)
+        self.redirects = {}
+
+    @property
+    def limiter(self):
+        return self.fetcher.limiter
+
+    @property
+    def negative_cache(self):
+        return self.fetcher.negative_cache
+
+    def prequery(self, titles: list) -> dict:
+        # Titles that redirect to the same page share its fetch.
+        redirects = self.fetcher.prequery(titles)
+        self.redirects.update(redirects)
+        return redirects
+
+    def fetch(self, term: str) -> Page:
+        key = normalize_title(term)
+        return self.pages.do(
+            normalize_title(self.redirects.get(key, key)),
+            lambda: self.fetcher.fetch(term),
+            keep=lambda page: page.status_code in _MEMOIZED_STATUS_CODES,
+        )
+
+    def close(self):
+        self.pages.clear()
+        self.parses.clear()
@@ -15,6 +15,7 @@ License: MIT
 from jplookup._cleanstr.identification import (
     percent_japanese,
     find_pronunciation_match,
+    PronunciationIndex,
 )
 from jplookup._cleanstr.removal import (
     remove_text_in_brackets,
@@ -79,6 +80,7 @@ def clean_data(word_info: list, term: str) -> dict:
                 if ipa is not None:
                     new_pronunciation["ipa"] = ipa
                 pronunciation_bank[kana] = new_pronunciation
+        pronunciation_index = PronunciationIndex.of_bank(pronunciation_bank)
 
         """
         Step 3) Cycles through the Parts of Speech under this Etymology header.
@@ -165,7 +167,7 @@ def clean_data(word_info: list, term: str) -> dict:
             """
             for t in transcriptions:
                 matching_pronunciation = find_pronunciation_match(
-                    pronunciation_bank,
+                    pronunciation_index,
                     t,
                 )
                 if matching_pronunciation is not None:
@@ -15,7 +15,7 @@ Version: 1.0
 License: MIT
 """
 
-from bs4 import BeautifulSoup
+import copy
 from jplookup._cleanstr.identification import (
     is_japanese_char,
     percent_japanese,
@@ -23,11 +23,14 @@ from jplookup._cleanstr.identification import (
 from jplookup._cleanstr.removal import (
     remove_text_in_brackets,
     remove_tags,
-    remove_unwanted_html,
+    unwrap_tags,
+    decompose_unwanted_html,
+    settle_strings,
 )
 from jplookup._cleanstr.textwork import (
     extract_tag_contents,
     extract_japanese,
+    find_outer_tags,
 )
 
 IGNORE_GIVEN_NAMES_AND_SURNAMES = True
@@ -43,8 +46,11 @@ GIVEN_NAMES_AND_SURNAMES = [
 ]
 
 
-def extract_data(layout: dict, find_embedded_kanji: bool):
-    """Extracts data from the given layout and returns it."""
+def extract_data(layout: dict, find_embedded_kanji: bool, index):
+    """
+    Extracts data from the given layout and returns it,
+    finding tags through the SectionIndex of the page.
+    """
     e_keys = list(layout.keys())
     e_keys.sort(key=lambda x: int(x[1:]))  # sorts for safety.
 
@@ -109,16 +115,15 @@ def extract_data(layout: dict, find_embedded_kanji: bool):
         """
         for i, p_header in enumerate(e["pronunciation-headers"]):
             # looks for the next <ul> which could contain pronunciation info.
-            current_ul = p_header.find_next("ul")
             end_line_num = to_end_line[f"p{i}"]  # SUSPECT
-            while current_ul and current_ul.sourceline < end_line_num:
+            for current_ul in index.iter_next(
+                p_header, "ul", end_line_num=end_line_num
+            ):
                 ul_text = current_ul.get_text()
                 if any(s in ul_text for s in ["ꜜ", "IPA"]):
                     contents = remove_tags(ul_text)
                     data[key]["pronunciations"].append(contents)
 
-                current_ul = current_ul.find_next("ul")
-
         """
         Step 3) Searches for headwords under each Part of Speech header
                 and places Usage Notes, 
@@ -131,7 +136,7 @@ def extract_data(layout: dict, find_embedded_kanji: bool):
             """
             # looks for the first next <span class="headword-line">.
             headword = None
-            headword_span = s_header.find_next("span", class_="headword-line")
+            headword_span = index.find_next(s_header, "span", class_="headword-line")
 
             # determines where this etymology information ends.
             if i == len(e["speech-headers"]) - 1:
@@ -187,30 +192,31 @@ def extract_data(layout: dict, find_embedded_kanji: bool):
             """
             Step 3b) Searches for an ordered list that contains definitions.
             """
-            ol = headword_span.find_next("ol")
+            ol = index.find_next(headword_span, "ol")
             definitions = []
             if ol is not None:  # the <ol> with definitions was found.
-                ol_str = remove_unwanted_html(str(ol))
-                li_contents = extract_tag_contents(ol_str, "li")
+                # Works on a copy of the <ol> so the page itself isn't changed.
+                ol = copy.copy(ol)
+                settle_strings(ol)
+                decompose_unwanted_html(ol)
+                settle_strings(ol)
 
                 # Iterates through every listed item in the ordered list.
-                for li in li_contents:
+                for li_tag in find_outer_tags(ol, "li"):
+                    li = str(li_tag)
                     if len(li) <= 9 or '<div class="citation-whole">' in li:
                         continue  # ignores tiny <li>'s and other irrelevants.
 
                     entry = {"definition": ""}
 
                     # Cleans up the text contents.
-                    tag_closing_index = li.find(">")
-                    li = li[tag_closing_index + 1 : -5]
                     if find_embedded_kanji:
-                        li_with_anchors = li
-                        li_with_anchors = remove_tags(
-                            li_with_anchors,
-                            omissions=["a"],
-                        )
+                        li_with_anchors = copy.copy(li_tag)
+                        unwrap_tags(li_with_anchors, omissions=["a"])
+                        settle_strings(li_with_anchors)
 
-                    li = remove_tags(li, omissions=["ol", "li", "dd", "b"])
+                    unwrap_tags(li_tag, omissions=["ol", "li", "dd", "b"])
+                    li = li_tag.decode_contents()
 
                     li = li.replace("<b> ", " <b>").replace(" </b>", "</b> ")
                     li = li.strip()
@@ -259,8 +265,7 @@ def extract_data(layout: dict, find_embedded_kanji: bool):
 
                             # Checks to see which first term has a redirect link.
                             redirecting_term_index = -1
-                            soup = BeautifulSoup(li_with_anchors, "html.parser")
-                            new_anchors = soup.find_all("a", class_="new")
+                            new_anchors = li_with_anchors.find_all("a", class_="new")
                             if len(new_anchors) > 0:
                                 anchor_texts = [a.get_text() for a in new_anchors]
                                 for term_index, alt_term in enumerate(kanji_terms):
@@ -0,0 +1,97 @@
+"""
+Filename: jplookup._scrape._html._section_index.py
+Author: TravisGK
+Date: 2025-03-22
+
+Description: This file defines an index of the Japanese section of a page,
+             made in a single pass over the tags after the Japanese header.
+
+             Finding the next header, table, list or headword after a tag
+             is then a binary search over the tags of that name,
+             rather than a new walk through the rest of the page
+             like BeautifulSoup's find_next(...) does.
+             Lookups the index can't answer (a tag name it doesn't hold,
+             or an element it never saw) fall back on that walk.
+
+Version: 1.0
+License: MIT
+"""
+
+from bisect import bisect_right
+from bs4 import Tag
+
+INDEXED_TAGS = (
+    "h1",
+    "h2",
+    "h3",
+    "h4",
+    "h5",
+    "h6",
+    "div",
+    "table",
+    "p",
+    "ul",
+    "ol",
+    "span",
+)
+
+
+class SectionIndex:
+    """
+    An index of the tags in <INDEXED_TAGS> that come after the <jp_header>,
+    in order of appearance.
+    """
+
+    def __init__(self, jp_header):
+        self._positions = {id(jp_header): 0}
+        self._tags = {name: [] for name in INDEXED_TAGS}
+        self._tag_positions = {name: [] for name in INDEXED_TAGS}
+
+        position = 0
+        for element in jp_header.next_elements:
+            if not isinstance(element, Tag):
+                continue
+            position += 1
+            tags = self._tags.get(element.name)
+            if tags is not None:
+                self._positions[id(element)] = position
+                tags.append(element)
+                self._tag_positions[element.name].append(position)
+
+    def iter_next(self, element, name: str, class_=None, end_line_num=None):
+        """
+        Yields the <name> tags (of the given class) after the <element>
+        in order of appearance, stopping at the first one
+        that's on or after <end_line_num>.
+        """
+        position = self._positions.get(id(element))
+        if name not in self._tags or position is None:
+            # Walks through the page, the same as BeautifulSoup would.
+            tags = element.find_all_next(name)
+            start = 0
+        else:
+            tags = self._tags[name]
+            start = bisect_right(self._tag_positions[name], position)
+
+        for i in range(start, len(tags)):
+            tag = tags[i]
+            if end_line_num is not None and tag.sourceline >= end_line_num:
+                return
+            if class_ is None or _has_class(tag, class_):
+                yield tag
+
+    def find_next(self, element, name: str, class_=None):
+        """
+        Returns the first <name> tag (of the given class) after the <element>,
+        the same as <element>.find_next(<name>, class_=<class_>) would.
+        """
+        return next(self.iter_next(element, name, class_), None)
+
+
+def _has_class(tag, class_: str) -> bool:
+    # Matches a single class or the whole class attribute,
+    # the same way BeautifulSoup's class_ argument does.
+    classes = tag.get("class")
+    if classes is None:
+        return False
+    return class_ in classes or " ".join(classes) == class_
@@ -10,10 +10,11 @@ Version: 1.0
 License: MIT
 """
 
-from bs4 import BeautifulSoup
-from jplookup._cleanstr.identification import is_japanese_char
+from jplookup._cleanstr.identification import leading_japanese
 from jplookup._cleanstr.removal import remove_tags
+from jplookup._cleanstr.soup import make_soup
 from ._extract_data import extract_data
+from ._section_index import SectionIndex
 from ._clean_data import clean_data
 
 PARTS_OF_SPEECH = [
@@ -83,23 +84,35 @@ def scrape_word_info(
     """
     Step 1) Looks for the source line where the Japanese ends.
     """
+    # Every later lookup of a tag goes through this index of the section.
+    index = SectionIndex(jp_header)
     end_line_num = 9999999
-    ending_header = jp_header.find_next("div", class_="mw-heading mw-heading2")
+    ending_header = index.find_next(jp_header, "div", class_="mw-heading mw-heading2")
     if ending_header is not None:
         end_line_num = ending_header.sourceline
 
     """
     Step 2) Finds title tags containing "Pronunciation" and "Etymology".
     """
+    # Lists the (header, text) of every header level in order of appearance.
+    headers_of_levels = [
+        [
+            (header, header.get_text())
+            for header in index.iter_next(
+                jp_header,
+                header_tag,
+                end_line_num=end_line_num,
+            )
+        ]
+        for header_tag in HEADER_TAGS
+    ]
 
     def find_header_tags(contained_text: str) -> list:
         next_headers = []
-        for header_tag in HEADER_TAGS:
-            current_header = jp_header.find_next(header_tag)
-            while current_header and current_header.sourceline < end_line_num:
-                if current_header.get_text().startswith(contained_text):
-                    next_headers.append(current_header)
-                current_header = current_header.find_next(header_tag)
+        for headers in headers_of_levels:
+            for header, header_text in headers:
+                if header_text.startswith(contained_text):
+                    next_headers.append(header)
 
         return next_headers
 
@@ -115,15 +128,13 @@ def scrape_word_info(
     found_word_part_headers = []
     breakout = False
     for part in PARTS_OF_SPEECH:
-        for tag in HEADER_TAGS:
-            current_header = jp_header.find_next(tag)
-            while current_header and current_header.sourceline < end_line_num:
-                header_text = current_header.get_text().strip()
+        for headers in headers_of_levels:
+            for current_header, header_text in headers:
+                header_text = header_text.strip()
                 if header_text.startswith(part) and header_text != part + "s":
                     found_word_parts.append(part)
                     found_word_part_lines.append(current_header.sourceline)
                     found_word_part_headers.append(current_header)
-                current_header = current_header.find_next(tag)
 
     # Zips, sorts by order of appearance, and unzips back into separate lists.
     if len(found_word_part_lines) > 0:
@@ -175,11 +186,13 @@ def scrape_word_info(
             next_ety_line_num = etymology_headers[i + 1].sourceline
 
         # Looks for any "Alternative spelling" specifications.
-        alt_spellings_header = e.find_next("table", class_="wikitable floatright")
+        alt_spellings_header = index.find_next(
+            e, "table", class_="wikitable floatright"
+        )
 
         if alt_spellings_header is None:
-            alt_spellings_header = jp_header.find_next(
-                "table", class_="wikitable floatright"
+            alt_spellings_header = index.find_next(
+                jp_header, "table", class_="wikitable floatright"
             )
 
         if alt_spellings_header is not None:
@@ -188,17 +201,13 @@ def scrape_word_info(
                 alt_spellings_header.sourceline <= next_ety_line_num
                 and "Alternative spelling" in table_text
             ):
-                soup = BeautifulSoup(table_text, "html.parser")
+                soup = make_soup(table_text)
                 alt_spellings = soup.find_all("span", class_="Jpan")
                 if len(alt_spellings) > 0:
                     alts = []
                     for alt_spelling_span in alt_spellings:
                         tagless = remove_tags(str(alt_spelling_span))
-                        for i, c in enumerate(tagless):
-                            if not is_japanese_char(c):
-                                tagless = tagless[:i]
-                                break
-                        alts.append(tagless)
+                        alts.append(leading_japanese(tagless))
                     layout[key]["alternative-spellings"] = alts
 
         # Adds any pronunciation header that's below the "Etymology" header.
@@ -247,8 +256,8 @@ def scrape_word_info(
                 # Retrieves the text contents out of either
                 # the following <ul> or <p> to get the usage notes,
                 # grabbing the closest text.
-                next_p = u.find_next("p")
-                next_ul = u.find_next("ul")
+                next_p = index.find_next(u, "p")
+                next_ul = index.find_next(u, "ul")
                 DUMMY_PHRASE = "Japanese terms spelled with"
                 if next_p and next_p.sourceline < next_ety_line_num:
                     u_used[j] = True
@@ -303,7 +312,7 @@ def scrape_word_info(
 
             # Looks for a <table> with a redirect to another webpage
             # for an alternative spelling.
-            next_table = etym_header.find_next("table", class_=JP_TABLE)
+            next_table = index.find_next(etym_header, "table", class_=JP_TABLE)
             if next_table is not None and next_table.sourceline < end_line:
                 redirect_terms = get_alternative_terms_from_table(next_table)
 
@@ -356,7 +365,11 @@ def scrape_word_info(
             then cleans up that data for user-friendliness
             and returns the result.
     """
-    data, embedded_kanji_redirects = extract_data(layout, find_embedded_kanji)
+    data, embedded_kanji_redirects = extract_data(
+        layout,
+        find_embedded_kanji,
+        index,
+    )
     if len(embedded_kanji_redirects) > 0:
         return None, None, embedded_kanji_redirects
 
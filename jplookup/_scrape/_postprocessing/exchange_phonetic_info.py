@@ -7,13 +7,15 @@ Description: This file defines a function that collects every pronunciation
              in <results> and has them compared against each other
              in order to fill in missing phonetic information, with
              matches being made by their kana transcriptions.
+             The pronunciations are indexed by their kana, so each one
+             is only compared against those that could match it.
 
 Version: 1.0
 License: MIT
 """
 
 import jaconv
-from jplookup._cleanstr.identification import kata_matches
+from jplookup._cleanstr.identification import kata_matches, PronunciationIndex
 
 
 def exchange_phonetic_info(results):
@@ -39,6 +41,9 @@ def exchange_phonetic_info(results):
     if len(all_pronunciations) <= 1:
         return results
 
+    # Only pronunciations of the same index key can match each other.
+    kata_index = PronunciationIndex((kata, j) for j, kata in enumerate(all_kata))
+
     # Shares information among one another.
     KEYS = ["kana", "furigana", "region", "pitch-accent", "ipa"]
     needs_updates = [True for _ in all_pronunciations]
@@ -48,7 +53,8 @@ def exchange_phonetic_info(results):
         if not needs_updates[i]:
             continue
 
-        for j, giver_p in enumerate(all_pronunciations):
+        for _, j in kata_index.candidates(all_kata[i]):
+            giver_p = all_pronunciations[j]
             if i == j or receiver_p.get("pitch-accent") not in [
                 None,
                 giver_p.get("pitch-accent"),
@@ -74,7 +80,7 @@ def exchange_phonetic_info(results):
     for i in changed_indices:
         entry_i, etym, part, p_i = all_refs[i]
         p = results[entry_i][etym][part]["pronunciations"][p_i]
-        results[entry_i][etym][part]["pronunciations"][p_i] = {
-            key: p[key] for key in KEYS if p.get(key) is not None
-        }
+        results[entry_i][etym][part]["pronunciations"][p_i] = type(p)(
+            (key, p[key]) for key in KEYS if p.get(key) is not None
+        )
     return results
@@ -30,7 +30,8 @@ FORM_PHRASES = [
 ]
 
 
-def remove_irrelevant_definitions(results: list) -> list:
+def remove_irrelevant_entry_definitions(entry: dict) -> dict:
+    """Returns the <entry> with its irrelevant definitions removed."""
     forbidden = []  # forbidden to show up in parentheses.
     if REMOVE_ARCHAIC_DEFINITIONS:
         forbidden.extend(ARCHAIC_TERMS)
@@ -40,26 +41,25 @@ def remove_irrelevant_definitions(results: list) -> list:
         forbidden.extend(REGIONAL_TERMS)
 
     if len(forbidden) > 0:
-        for i, r in enumerate(results):
-            for etym_name, parts in r.items():
-                for p_index, part_and_data in enumerate(parts.items()):
-                    part_of_speech, word_data = part_and_data
-                    def_indices_to_remove = []
-                    for d_index, definition in enumerate(word_data["definitions"]):
-                        def_text = definition["definition"].lower()
+        for etym_name, parts in entry.items():
+            for p_index, part_and_data in enumerate(parts.items()):
+                part_of_speech, word_data = part_and_data
+                def_indices_to_remove = []
+                for d_index, definition in enumerate(word_data["definitions"]):
+                    def_text = definition["definition"].lower()
 
-                        if def_text.startswith("("):
-                            close_paren_i = def_text.find(")")
-                            if close_paren_i >= 0:
-                                context = def_text[1:close_paren_i]
-                                if any(s in context for s in forbidden):
-                                    def_indices_to_remove.append(d_index)
-                                    continue
+                    if def_text.startswith("("):
+                        close_paren_i = def_text.find(")")
+                        if close_paren_i >= 0:
+                            context = def_text[1:close_paren_i]
+                            if any(s in context for s in forbidden):
+                                def_indices_to_remove.append(d_index)
+                                continue
 
-                        if any(phrase in def_text for phrase in FORM_PHRASES):
-                            def_indices_to_remove.append(d_index)
+                    if any(phrase in def_text for phrase in FORM_PHRASES):
+                        def_indices_to_remove.append(d_index)
 
-                    for d_index in reversed(def_indices_to_remove):
-                        del word_data["definitions"][d_index]
+                for d_index in reversed(def_indices_to_remove):
+                    del word_data["definitions"][d_index]
 
-    return results
+    return entry
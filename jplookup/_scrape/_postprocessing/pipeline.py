@@ -0,0 +1,161 @@
+"""
+Filename: jplookup._scrape._postprocessing.pipeline.py
+Author: TravisGK
+Date: 2025-03-22
+
+Description: This file defines the Postprocessor, which runs a series of
+             postprocessing stages over the results of scrape(...)
+             in as few walks through the results as it can.
+
+             Most stages only ever look at one entry at a time,
+             so every run of such stages is fused into a single walk
+             that takes each entry through all of them in turn.
+             A stage that needs every entry at once
+             (exchange_phonetic_info(...)) ends the walk before it.
+
+             Any stage can be turned off by its name;
+             the setting is kept in the environment so that it's used
+             by worker processes as well.
+
+Version: 1.0
+License: MIT
+"""
+
+import os
+from jplookup._cleanstr.removal import remove_alternative_spellings
+from .clean_keys import clean_entry_keys
+from .exchange_phonetic_info import exchange_phonetic_info
+from .irrelevant_definitions import remove_irrelevant_entry_definitions
+from .missing_furigana import fill_in_entry_furigana
+from .remove_empty_entries import remove_empty_parts
+
+_ENV_KEY = "JPLOOKUP_DISABLED_STAGES"
+
+
+class Stage:
+    """
+    A postprocessing stage called <name>.
+    If <per_entry>, <apply>(entry) returns the processed entry
+    (or None if the entry is to be removed);
+    otherwise, <apply>(results) returns the processed list of results.
+    """
+
+    def __init__(self, name: str, apply, per_entry: bool = True):
+        self.name = name
+        self.apply = apply
+        self.per_entry = per_entry
+
+
+def _remove_empty_entry(entry: dict):
+    # Returns None if nothing is left of the entry.
+    entry = remove_empty_parts(entry)
+    return entry if len(entry.keys()) > 0 else None
+
+
+STAGES = {
+    stage.name: stage
+    for stage in [
+        Stage("alternative-spellings", remove_alternative_spellings),
+        Stage("irrelevant-definitions", remove_irrelevant_entry_definitions),
+        Stage("phonetic-info", exchange_phonetic_info, per_entry=False),
+        Stage("missing-furigana", fill_in_entry_furigana),
+        Stage("empty-entries", _remove_empty_entry),
+        Stage("clean-keys", clean_entry_keys),
+    ]
+}
+
+
+def set_stage_enabled(name: str, enabled: bool):
+    """
+    Turns the postprocessing stage of the given <name> on or off
+    for this process and any processes it starts afterward.
+    """
+    if name not in STAGES:
+        raise ValueError(
+            f"Unknown postprocessing stage {name}; expected one of {tuple(STAGES)}."
+        )
+    disabled = _disabled_stages()
+    if enabled:
+        disabled.discard(name)
+    else:
+        disabled.add(name)
+    os.environ[_ENV_KEY] = ",".join(n for n in STAGES if n in disabled)
+
+
+def is_stage_enabled(name: str) -> bool:
+    """Returns True if the postprocessing stage of the given <name> is on."""
+    return name not in _disabled_stages()
+
+
+def _disabled_stages() -> set:
+    return set(n for n in os.environ.get(_ENV_KEY, "").split(",") if n)
+
+
+class Postprocessor:
+    """
+    Runs the stages of the given <names>, in order,
+    over a list of results.
+    """
+
+    def __init__(self, *names):
+        self.stages = [STAGES[name] for name in names]
+
+    def __call__(self, results: list) -> list:
+        """Returns the <results> after every enabled stage."""
+        disabled = _disabled_stages()
+        walk = []
+        for stage in self.stages:
+            if stage.name in disabled:
+                continue
+            if stage.per_entry:
+                walk.append(stage.apply)
+            else:
+                results = stage.apply(_walk(results, walk))
+                walk = []
+
+        return _walk(results, walk)
+
+
+def _walk(results: list, visitors: list) -> list:
+    """
+    Returns the <results> with each entry taken through every one
+    of the <visitors> in turn, leaving out entries a visitor removed.
+    """
+    if len(visitors) == 0:
+        return results
+
+    processed = []
+    for entry in results:
+        for visit in visitors:
+            entry = visit(entry)
+            if entry is None:
+                break
+        else:
+            processed.append(entry)
+
+    return processed
+
+
+# The postprocessing of the kanji that a term is composed of.
+postprocess_composition = Postprocessor(
+    "alternative-spellings",
+    "empty-entries",
+    "missing-furigana",
+    "clean-keys",
+)
+
+# The cleanup of results after the redirected pages are embedded.
+postprocess_embedded = Postprocessor(
+    "alternative-spellings",
+    "empty-entries",
+)
+
+# The final postprocessing of the results of scrape(...).
+postprocess_results = Postprocessor(
+    "alternative-spellings",
+    "irrelevant-definitions",
+    "phonetic-info",
+    "missing-furigana",
+    "empty-entries",
+    "clean-keys",
+)
@@ -4,69 +4,57 @@ Author: TravisGK
 Date: 2025-03-22
 
 Description: This file defines a function that will remove
-             all empty Parts of Speech, then will remove
-             all empty Etymologies, and then optionally will remove
-             all empty Entries from the given list of Wiktionary Entries.
+             all empty Parts of Speech and then will remove
+             all empty Etymologies from the given Wiktionary Entry.
 
 Version: 1.0
 License: MIT
 """
 
 
-def remove_empty_entries(
-    clean_data: list,
-    remove_entries: bool = False,
-):
+def remove_empty_parts(entry: dict) -> dict:
     """
-    Returns the given data with any elements with the value None
-    being removed.
+    Returns the given entry with its empty Parts of Speech
+    and then its empty Etymologies removed.
     """
-    indices_to_delete = []
-    for i, entry in enumerate(clean_data):
-        to_delete = []
+    to_delete = []
 
-        # Clears out empty definitions.
-        for etym_name, parts in entry.items():
-            if parts is None:
-                continue
-
-            for part_of_speech, part_data in parts.items():
-                if part_of_speech == "alternative-spellings":
-                    continue
-
-                defs = part_data.get("definitions")
-                if defs is None or len(defs) == 0:
-                    to_delete.append((etym_name, part_of_speech))
+    # Clears out empty definitions.
+    for etym_name, parts in entry.items():
+        if parts is None:
+            continue
 
-        for etym_name, part_of_speech in to_delete:
-            # Ensures the key exists before deleting.
-            if (
-                part_of_speech != "alternative-spellings"
-                and etym_name in entry
-                and part_of_speech in entry[etym_name]
-            ):
-                del entry[etym_name][part_of_speech]
-
-        # Clears out empty etymologies.
-        to_delete = []
-        for etym_name, parts in entry.items():
-            if parts is None:
+        for part_of_speech, part_data in parts.items():
+            if part_of_speech == "alternative-spellings":
                 continue
-            elif parts.get("alternative-spellings") is None:
-                if len(parts) == 0:
-                    to_delete.append(etym_name)
-            elif len(parts) == 1:
-                to_delete.append(etym_name)
 
-        # Deletes each, ensuring the key exists before deleting.
-        for etym_name in to_delete:
-            if etym_name in entry:
-                del entry[etym_name]
+            defs = part_data.get("definitions")
+            if defs is None or len(defs) == 0:
+                to_delete.append((etym_name, part_of_speech))
+
+    for etym_name, part_of_speech in to_delete:
+        # Ensures the key exists before deleting.
+        if (
+            part_of_speech != "alternative-spellings"
+            and etym_name in entry
+            and part_of_speech in entry[etym_name]
+        ):
+            del entry[etym_name][part_of_speech]
+
+    # Clears out empty etymologies.
+    to_delete = []
+    for etym_name, parts in entry.items():
+        if parts is None:
+            continue
+        elif parts.get("alternative-spellings") is None:
+            if len(parts) == 0:
+                to_delete.append(etym_name)
+        elif len(parts) == 1:
+            to_delete.append(etym_name)
 
-        # If the entry has no keys left, mark the index for deletion
-        if len(entry.keys()) == 0:
-            indices_to_delete.append(i)
+    # Deletes each, ensuring the key exists before deleting.
+    for etym_name in to_delete:
+        if etym_name in entry:
+            del entry[etym_name]
 
-    if remove_entries:
-        return [w for i, w in enumerate(clean_data) if i not in indices_to_delete]
-    return clean_data
+    return entry
@@ -0,0 +1,80 @@
+"""
+Filename: jplookup._scrape.ascrape.py
+Author: TravisGK
+Date: 2025-03-22
+
+Description: This file defines the asyncio counterpart of scrape(...),
+             which lets many lookups run concurrently.
+
+             Instead of sleeping between pages, every request waits on
+             a shared TokenBucket, so the lookups together never go over
+             the bucket's requests-per-second ceiling.
+
+Version: 1.0
+License: MIT
+"""
+
+import asyncio
+import functools
+from .scrape import scrape
+from ._fetch.rate_limit import TokenBucket
+from ._fetch.session import DEFAULT_TIMEOUT
+
+# The bucket shared by every lookup that isn't given a limiter or fetcher,
+# so that concurrent calls of ascrape(...) stay polite together.
+DEFAULT_LIMITER = TokenBucket()
+
+
+async def ascrape(
+    term: str,
+    limiter=None,
+    executor=None,
+    error_sleep_seconds=30,
+    verbose: bool = True,
+    cache=None,
+    session=None,
+    timeout=DEFAULT_TIMEOUT,
+    fetcher=None,
+    as_model: bool = False,
+):
+    """
+    Returns the same results as scrape(<term>), with the lookup
+    (including any recursive lookups) running on a worker thread
+    of the given <executor> (the loop's default if None).
+
+    Parameters:
+        term (str): the Japanese word to search.
+        limiter (TokenBucket): the bucket shared by all concurrent lookups;
+                               if None, the module's DEFAULT_LIMITER is used.
+        executor: the concurrent.futures executor to run the lookup on.
+        error_sleep_seconds: the duration in seconds that the program
+                             will sleep if it runs into a connection error.
+        verbose (bool): if False, the script won't print any error messages.
+        cache (PageCache): if given, Wiktionary pages are read from
+                           and saved to this persistent cache.
+        session (requests.Session): the pooled session used for every request.
+        timeout: the (connect, read) timeout in seconds of each request.
+        fetcher (Fetcher): if given, every page is fetched from it instead.
+        as_model (bool): if True, the results are returned as a list
+                         of Entries (see jplookup._model) instead of dicts.
+    """
+    if limiter is None and fetcher is None:
+        limiter = DEFAULT_LIMITER
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        executor,
+        functools.partial(
+            scrape,
+            term,
+            re_sleep_seconds=0,  # the limiter does the pacing.
+            error_sleep_seconds=error_sleep_seconds,
+            verbose=verbose,
+            cache=cache,
+            session=session,
+            timeout=timeout,
+            limiter=limiter,
+            fetcher=fetcher,
+            as_model=as_model,
+        ),
+    )
@@ -15,27 +15,42 @@ Version: 1.0
 License: MIT
 """
 
+import copy
+import functools
 import requests
 import time
-from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
 from jplookup._cleanstr.dictform import get_dictionary_form
 from jplookup._cleanstr.identification import is_kanji
+from jplookup._cleanstr.soup import make_soup
+from jplookup._model import to_model, to_results
 from jplookup._cleanstr.removal import (
+    FURTHER_PRONUNCIATIONS_KEY,
     shorten_html,
-    remove_further_pronunciations,
-    remove_alternative_spellings,
+    prune_html,
+    decompose_further_pronunciations,
+    settle_strings,
 )
+from ._fetch.fetchers import CachedFetcher, PagesNeeded, ResolverFetcher
+from ._fetch.rate_limit import THROTTLE_STATUS_CODES, parse_retry_after
+from ._fetch.session import DEFAULT_TIMEOUT
 from ._html.scrape_word_info import (
     HEADER_TAGS,
     scrape_word_info,
     get_alternative_terms_from_table,
 )
-from ._postprocessing.exchange_phonetic_info import exchange_phonetic_info
-from ._postprocessing.remove_empty_entries import remove_empty_entries
 from ._postprocessing.embed_redirects import embed_redirects
-from ._postprocessing.clean_keys import clean_keys
-from ._postprocessing.missing_furigana import fill_in_missing_furigana
-from ._postprocessing.irrelevant_definitions import remove_irrelevant_definitions
+from ._postprocessing.pipeline import (
+    postprocess_composition,
+    postprocess_embedded,
+    postprocess_results,
+)
+
+# The most child pages (alternative spellings and embedded kanji)
+# of one page that are looked up at the same time.
+MAX_CHILD_WORKERS = 8
+
+MAX_DEPTH = 1  # not inclusive. not tested for above 1.
 
 
 def scrape(
@@ -46,6 +61,14 @@ def scrape(
     error_sleep_seconds=30,
     force_sleep: bool = False,
     verbose: bool = True,
+    cache=None,
+    session=None,
+    timeout=DEFAULT_TIMEOUT,
+    limiter=None,
+    offline: bool = False,
+    fetcher=None,
+    negative_cache=None,
+    as_model: bool = False,
 ):
     """
     Scrapes a Wiktionary entry for Japanese word information,
@@ -101,15 +124,164 @@ def scrape(
         force_sleep (bool): if True, the program sleeps for <re_sleep_seconds>
                             regardless of the current recursive depth.
         verbose (bool): if False, the script won't print any error messages.
+        cache (PageCache): if given, Wiktionary pages are read from
+                           and saved to this persistent cache.
+        session (requests.Session): the pooled session used for every request;
+                                    if None, one is created for this call
+                                    and shared by all its recursive calls.
+        timeout: the (connect, read) timeout in seconds of each request.
+        limiter (TokenBucket): if given, every request made by this call
+                               and its recursive calls takes a token from it,
+                               and the limiter handles the waiting
+                               when Wiktionary answers with a 429/503.
+        offline (bool): if True, pages are only read from the <cache>
+                        and no requests are made at all.
+        fetcher (Fetcher): where every page is fetched from
+                           (a LiveFetcher, CachedFetcher or CassetteFetcher).
+                           If given, <cache>, <session>, <timeout>, <limiter>
+                           and <offline> are ignored.
+        negative_cache (NegativeCache): if given, pages known to be missing
+                                        are skipped, and conjugations that
+                                        were resolved before go straight
+                                        to their dictionary form.
+                                        Ignored if a <fetcher> is given.
+        as_model (bool): if True, the results are returned as a list
+                         of Entries (see jplookup._model) instead of dicts.
     """
     """Returns either a list or None."""
+    if fetcher is None:
+        # The fetcher (and the session it creates if none was given)
+        # is shared by all recursive calls.
+        with CachedFetcher(
+            cache,
+            session,
+            timeout,
+            limiter,
+            offline,
+            negative_cache=negative_cache,
+        ) as fetcher:
+            return scrape(
+                term,
+                depth,
+                original_term,
+                re_sleep_seconds=re_sleep_seconds,
+                error_sleep_seconds=error_sleep_seconds,
+                force_sleep=force_sleep,
+                verbose=verbose,
+                fetcher=fetcher,
+                as_model=as_model,
+            )
+
+    def scrape_page():
+        return _scrape(
+            term,
+            depth,
+            original_term,
+            re_sleep_seconds,
+            error_sleep_seconds,
+            force_sleep,
+            verbose,
+            fetcher,
+        )
+
+    if fetcher.parses is None or depth == 0:
+        results = scrape_page()
+    else:
+        # The same page reached from different terms is only parsed once.
+        # (Top-level terms are each scraped once per run, so they aren't kept.)
+        # Results are copied since the caller's postprocessing modifies them.
+        results = fetcher.parses.do(
+            (term, depth),
+            scrape_page,
+            keep=lambda results: results is not None,
+        )
+        results = copy.deepcopy(results)
+
+    # The final results are postprocessed in the compact model.
+    if depth > 0 or results is None:
+        return results
+    return to_model(results) if as_model else to_results(results)
+
+
+def _scrape_children(children: list, fetcher, **kwargs) -> list:
+    """
+    Returns the list of scrape(...) results for each of the <children>
+    (in the same order), looked up with the given keyword arguments.
+
+    If the <fetcher> paces its requests with a limiter, the children
+    are looked up concurrently, since the limiter keeps them all polite;
+    otherwise they're looked up one by one.
+
+    If the <fetcher> doesn't have the pages of some children yet,
+    every child is still tried before all the missing pages are asked for.
+    """
+    if fetcher.limiter is None or len(children) <= 1:
+        lookups = [
+            functools.partial(scrape, child, fetcher=fetcher, **kwargs)
+            for child in children
+        ]
+        return _gather_children(lookups)
+
+    with ThreadPoolExecutor(min(len(children), MAX_CHILD_WORKERS)) as executor:
+        futures = [
+            executor.submit(scrape, child, fetcher=fetcher, **kwargs)
+            for child in children
+        ]
+        return _gather_children([future.result for future in futures])
+
+
+def _gather_children(lookups: list) -> list:
+    # Returns the result of each lookup, raising PagesNeeded
+    # with every missing page once all of them have been tried.
+    results = []
+    titles_needed = []
+    for lookup in lookups:
+        try:
+            results.append(lookup())
+        except PagesNeeded as e:
+            titles_needed.extend(e.titles)
+
+    if len(titles_needed) > 0:
+        raise PagesNeeded(titles_needed)
+    return results
+
+
+def _scrape(
+    term: str,
+    depth: int,
+    original_term,
+    re_sleep_seconds,
+    error_sleep_seconds,
+    force_sleep: bool,
+    verbose: bool,
+    fetcher,
+):
+    """
+    Returns the results of scrape(...) for the given <term>
+    once the <fetcher> to get every page from has been settled.
+    """
     MAX_CONNECT_ATTEMPTS = 5  # number of times to retry if fails for a term.
-    MAX_DEPTH = 1  # not inclusive. not tested for above 1.
 
     if depth > 0 or force_sleep:
         # Sleeps when doing a recursive loop to prevent getting blocked.
         time.sleep(re_sleep_seconds)
 
+    negative_cache = fetcher.negative_cache
+    if negative_cache is not None and depth < MAX_DEPTH:
+        # A conjugation that was resolved before goes straight
+        # to its dictionary form without fetching its own page.
+        dict_form = negative_cache.get_dictionary_form(term)
+        if dict_form is not None:
+            return scrape(
+                dict_form,
+                depth + 1,
+                dict_form,
+                re_sleep_seconds=re_sleep_seconds,
+                error_sleep_seconds=error_sleep_seconds,
+                verbose=verbose,
+                fetcher=fetcher,
+            )
+
     """
     Step 1) Retrieves HTML and searches for the main header.
     """
@@ -126,10 +298,27 @@ def scrape(
     num_attempts = 0
     successful = False
     while num_attempts < MAX_CONNECT_ATTEMPTS:
+        throttled_status = None
         try:
-            url = f"https://en.wiktionary.org/wiki/{term}"
-            headers = {"User-Agent": "Mozilla/5.0"}
-            response = requests.get(url, headers=headers)
+            response = fetcher.fetch(term)
+            if response.status_code in THROTTLE_STATUS_CODES:
+                # Wiktionary is asking the program to slow down,
+                # so the page is requested again once it's allowed.
+                # A limiter waits out the Retry-After by itself.
+                if verbose:
+                    print(
+                        f"Error {response.status_code}: "
+                        f"Wiktionary is throttling requests for {term}."
+                    )
+                throttled_status = response.status_code
+                num_attempts += 1
+                if fetcher.limiter is None and num_attempts < MAX_CONNECT_ATTEMPTS:
+                    retry_after = parse_retry_after(response.retry_after)
+                    time.sleep(
+                        error_sleep_seconds if retry_after is None else retry_after
+                    )
+                continue
+
             if response.status_code != 200:
                 if verbose:
                     print(
@@ -137,11 +326,21 @@ def scrape(
                         f"Could not fetch page for {term}. Trying again...",
                         end="",
                     )
+                # Every 404 that Wiktionary answers with (or that the query API
+                # found missing) is in the negative cache by now.
+                is_missing = (
+                    negative_cache is not None
+                    and response.status_code == 404
+                    and negative_cache.is_missing(term)
+                )
                 if depth < MAX_DEPTH:
                     # The word could be a conjugated form of a verb
                     # so the program tries to search the dict form of it.
                     dict_form = get_dictionary_form(term)
                     if dict_form is not None:
+                        if is_missing:
+                            # Only a page that doesn't exist is skipped later.
+                            negative_cache.add_dictionary_form(term, dict_form)
                         return scrape(
                             dict_form,
                             depth + 1,
@@ -149,8 +348,15 @@ def scrape(
                             re_sleep_seconds=re_sleep_seconds,
                             error_sleep_seconds=error_sleep_seconds,
                             verbose=verbose,
+                            fetcher=fetcher,
                         )
 
+                if is_missing:
+                    # Retrying won't help for a page that doesn't exist.
+                    if verbose:
+                        print(f"\nCOULD NOT FIND DATA FOR {term}...")
+                    return None
+
                 num_attempts += 1
                 if num_attempts == MAX_CONNECT_ATTEMPTS - 1:
                     if verbose:
@@ -174,14 +380,92 @@ def scrape(
             num_attempts += 1  # reattempts a few times before giving up.
 
     if not successful:
+        if throttled_status is not None:
+            # The page wasn't found to be missing, so the term is raised
+            # to be tried again later rather than saved as unfound.
+            raise requests.exceptions.HTTPError(
+                f"Error {throttled_status}: "
+                f"Wiktionary kept throttling requests for {term}."
+            )
         return None
 
-    # Shortens HTML to give BeautifulSoup less to parse.
-    clean_text = shorten_html(response.text)
-    clean_text = remove_further_pronunciations(clean_text)
+    return _scrape_html(
+        term,
+        response.text,
+        depth,
+        original_term,
+        re_sleep_seconds,
+        error_sleep_seconds,
+        verbose,
+        fetcher,
+    )
+
+
+def scrape_html(
+    term: str,
+    html: str,
+    resolver=None,
+    verbose: bool = False,
+):
+    """
+    Returns the same results as scrape(<term>) would,
+    but parsed from the given <html> of the term's Wiktionary page
+    instead of fetching it, so pages from dumps, caches or files
+    can be parsed without any network access.
+
+    Parameters:
+        term (str): the Japanese word that the <html> is the page of.
+        html (str): the HTML of the term's Wiktionary page.
+        resolver: a function called with the title of every other page
+                  the term leads to (alternative spellings, embedded kanji
+                  or a dictionary form), which returns that page's HTML
+                  or None if there's no such page.
+                  If None, every other page counts as missing.
+        verbose (bool): if False, the script won't print any error messages.
+    """
+    fetcher = ResolverFetcher(resolver, pages={term: html})
+    results = _scrape_html(
+        term,
+        html,
+        depth=0,
+        original_term=None,
+        re_sleep_seconds=0,
+        error_sleep_seconds=0,
+        verbose=verbose,
+        fetcher=fetcher,
+    )
+    return None if results is None else to_results(results)
+
+
+def _scrape_html(
+    term: str,
+    html: str,
+    depth: int,
+    original_term,
+    re_sleep_seconds,
+    error_sleep_seconds,
+    verbose: bool,
+    fetcher,
+):
+    """
+    Returns the results of scrape(...) for the given <term>
+    parsed from the <html> of its page, with any other pages
+    it leads to gotten from the <fetcher>.
+    """
+    negative_cache = fetcher.negative_cache
+
+    # Shortens HTML and cuts out unused blocks
+    # to give BeautifulSoup less to parse.
+    clean_text = prune_html(shorten_html(html))
+
+    # The page is only parsed once; everything after works on its tree.
+    soup = make_soup(clean_text)
+    if FURTHER_PRONUNCIATIONS_KEY in clean_text:
+        # Removes what the pruning couldn't (i.e. unclosed tags).
+        if decompose_further_pronunciations(soup):
+            settle_strings(soup)
 
     # Finds the header tag with "Japanese"; returns if no header was found.
-    soup = BeautifulSoup(clean_text, "html.parser")
     japanese_header = None
     headers = []
     for header_tag in HEADER_TAGS:
@@ -211,25 +495,21 @@ def scrape(
     # then a list of recursive results is returned to the user.
     if embedded_kanji_redirects and len(embedded_kanji_redirects) > 0:
         comp = []
-        for embed in embedded_kanji_redirects:
-            info = scrape(
-                embed,
-                depth=depth + 1,
-                original_term=term,
-                re_sleep_seconds=re_sleep_seconds,
-                error_sleep_seconds=error_sleep_seconds,
-                force_sleep=True,
-                verbose=verbose,
-            )
+        infos = _scrape_children(
+            embedded_kanji_redirects,
+            fetcher,
+            depth=depth + 1,
+            original_term=term,
+            re_sleep_seconds=re_sleep_seconds,
+            error_sleep_seconds=error_sleep_seconds,
+            force_sleep=True,
+            verbose=verbose,
+        )
+        for info in infos:
             if info is not None:
                 comp.append(info[0])
 
-        if len(comp) > 0:
-            comp = remove_alternative_spellings(comp)
-        comp = remove_empty_entries(comp, remove_entries=True)
-        comp = fill_in_missing_furigana(comp)
-        comp = clean_keys(comp)
-        return comp
+        return postprocess_composition(to_model(comp))
 
     # Otherwise, results are added as normal.
     if word_info is not None and len(word_info.keys()) > 0:
@@ -247,22 +527,24 @@ def scrape(
         # Wiktionary is redirecting the user to.
         JP_TABLE = "wikitable ja-see"
         next_tables = japanese_header.find_all_next("table", class_=JP_TABLE)
+        alternatives = []
         for table in next_tables:
-            alternatives = get_alternative_terms_from_table(table)
-            if len(alternatives) > 0:
-                # A recursive call with depth added is made.
-                for alternative in alternatives:
-                    alt_results = scrape(
-                        alternative,
-                        depth + 1,
-                        term,
-                        re_sleep_seconds=re_sleep_seconds,
-                        error_sleep_seconds=error_sleep_seconds,
-                        verbose=verbose,
-                    )
-
-                    if alt_results is not None:
-                        results.extend(alt_results)
+            alternatives.extend(get_alternative_terms_from_table(table))
+
+        # A recursive call with depth added is made for every alternative,
+        # all of them starting as soon as the tables are read.
+        all_alt_results = _scrape_children(
+            alternatives,
+            fetcher,
+            depth=depth + 1,
+            original_term=term,
+            re_sleep_seconds=re_sleep_seconds,
+            error_sleep_seconds=error_sleep_seconds,
+            verbose=verbose,
+        )
+        for alt_results in all_alt_results:
+            if alt_results is not None:
+                results.extend(alt_results)
 
     if (results is None or len(results) == 0) and depth < MAX_DEPTH:
         # If there were no results found after looking for alternatives,
@@ -270,6 +552,8 @@ def scrape(
         # of the word (the program assuming it could be a verb).
         dict_form = get_dictionary_form(term)
         if dict_form is not None:
+            if negative_cache is not None:
+                negative_cache.add_dictionary_form(term, dict_form)
             return scrape(
                 dict_form,
                 depth + 1,
@@ -277,23 +561,20 @@ def scrape(
                 re_sleep_seconds=re_sleep_seconds,
                 error_sleep_seconds=error_sleep_seconds,
                 verbose=verbose,
+                fetcher=fetcher,
             )
 
     """
     Step 3) Embeds the relevant word information from any
             pages that were redirected to.
     """
-    # results = remove_empty_entries(results)  # probably unneeded
     if depth == 0:
         results = embed_redirects(
             results,
             redirects_to_etym,
             term,
         )
-
-        if len(results) > 0:
-            results = remove_alternative_spellings(results)
-        results = remove_empty_entries(results, remove_entries=True)
+        results = postprocess_embedded(results)
 
     """
     Step 4) Goes through each entry 
@@ -316,11 +597,4 @@ def scrape(
     Step 5) Shares pronunciation information with those of matching kana
             that lack pitch-accent or IPA (depth is at 0)
     """
-    results = remove_alternative_spellings(results)
-    results = remove_irrelevant_definitions(results)
-    results = exchange_phonetic_info(results)
-    results = fill_in_missing_furigana(results)
-    results = remove_empty_entries(results, remove_entries=True)
-    results = clean_keys(results)
-
-    return results
+    return postprocess_results(to_model(results))
@@ -11,29 +11,26 @@ License: MIT
 """
 
 import json
+import os
 import random
 import sys
 import time
+from datetime import datetime, timedelta, timezone
+from jplookup._journal import Journal, FOUND, UNFOUND, EXCEPTION
+from jplookup._model import dumps_json, to_model, to_results, write_json
 from jplookup._scrape.scrape import scrape
+from jplookup._scrape._fetch.rate_limit import AdaptiveRateController
+from jplookup._scrape._fetch.fetchers import CachedFetcher
+from jplookup._scrape._fetch.single_flight import SingleFlightFetcher
+from jplookup._scrape._fetch.session import DEFAULT_TIMEOUT
 import jplookup.anki
 
 
-def scrape_all(
-    out_path="jp-data.json",
-    in_path="n5.txt",
-    words=None,
-    sleep_seconds=0.1,
-    error_sleep_seconds=20,
-    verbose: bool = True,
-):
+def load_terms(in_path: str, words=None) -> list:
     """
-    Takes either an <in_path> specifying a .txt file to load terms from,
-    or takes a list of <words> directly, then saves the scraped
-    results as a single dictionary to the <out_path> JSON.
+    Returns all unique Japanese terms, either from the given list of <words>
+    or from the lines of the .txt file at <in_path>.
     """
-    PATIENCE = sleep_seconds
-
-    # Grabs all unique Japanese terms.
     terms = []
     if words is not None:
         for word in words:
@@ -46,78 +43,176 @@ def scrape_all(
                 if clean_line not in terms:
                     terms.append(clean_line)
 
-    start_time = time.time()
+    return terms
 
-    # Collects data into one dictionary.
-    # Any terms that throw errors will be saved to their own text files.
-    data = {}
-    unfound = []
-    exceptionals = []
-    for i, term in enumerate(terms):
-        try:
-            if i > 0:
-                if i % 20 == 0:
-                    # Sleeps for a little while every 20 terms.
-                    sleep_length = random.uniform(
-                        error_sleep_seconds * 0.75,
-                        error_sleep_seconds * 1.25,
-                    )
-                else:
-                    sleep_length = random.uniform(
-                        PATIENCE * 0.75,
-                        PATIENCE * 1.5,
-                    )
-                time.sleep(sleep_length)
 
-            # Scrapes.
-            word_info = scrape(
-                term,
-                re_sleep_seconds=sleep_seconds,
-                error_sleep_seconds=error_sleep_seconds,
-            )
-            if word_info and len(word_info) > 0:
-                # Prints how much time is remaining to scrape all the words.
-                percent_done = int((i + 1) / len(terms) * 100)
-                elapsed = time.time() - start_time
-                elapsed_per_entry = elapsed / (i + 1)  # avg
-                num_remaining = len(terms) - (i + 1)
-                remaining_time = int(num_remaining * elapsed_per_entry)
-                hours = remaining_time // 3600
-                remaining_time %= 3600
-                minutes = remaining_time // 60
-                remaining_time %= 60
-                seconds = remaining_time
+def timestamp() -> str:
+    """Returns the current UTC time as an ISO 8601 string."""
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
 
-                if verbose:
-                    print("\n" * 6)
-                    print(json.dumps(word_info[0], indent=4, ensure_ascii=False))
-                    print(
-                        f"{percent_done:> 2d}% [{hours}:{minutes:02}:{seconds:02}] {term}"
-                    )
 
-                # Adds the entry to the dictionary.
-                data[term] = word_info
+def load_previous_run(out_path: str, max_age_days=None) -> dict:
+    """
+    Returns a dict of journal-style records for the terms
+    saved in an existing <out_path> JSON, using the scrape timestamps
+    kept in the <out_path>.meta.json file next to it.
 
-            else:
-                if verbose:
-                    print(f"No data saved for {term}!")
-                unfound.append(term)
-
-        except KeyboardInterrupt as e:
-            if verbose:
-                print("Keyboard interrupt received, exiting gracefully.")
-            sys.exit(0)
-
-        except Exception as e:
-            if verbose:
-                print(
-                    "################################\n"
-                    + f"EXCEPTION {e} from term {term}\n"
-                    + "################################\n"
-                )
-            exceptionals.append(term)
+    Terms older than <max_age_days> (or without a timestamp,
+    if <max_age_days> is given) are left out so they get scraped again.
+    """
+    if out_path is None or not os.path.exists(out_path):
+        return {}
+
+    with open(out_path, "r", encoding="utf-8") as json_file:
+        previous = json.load(json_file)
+
+    scraped_at = {}
+    meta_path = out_path + ".meta.json"
+    if os.path.exists(meta_path):
+        with open(meta_path, "r", encoding="utf-8") as meta_file:
+            scraped_at = json.load(meta_file).get("scraped-at", {})
 
-    # End of run. Saves everything that went wrong (if anything).
+    oldest = None
+    if max_age_days is not None:
+        oldest = datetime.now(timezone.utc) - timedelta(days=max_age_days)
+
+    records = {}
+    for term, word_info in previous.items():
+        when = scraped_at.get(term)
+        if oldest is not None and (
+            when is None or datetime.fromisoformat(when) < oldest
+        ):
+            continue  # stale.
+
+        records[term] = {
+            "term": term,
+            "status": FOUND,
+            "data": word_info,
+            "scraped-at": when,
+        }
+
+    return records
+
+
+def open_journal(out_path: str, resume: bool = True):
+    """
+    Returns the Journal kept next to the <out_path> JSON
+    and a dict of the terms it already holds.
+    (None, {}) is returned if there's no <out_path> or <resume> is False.
+    """
+    if out_path is None or not resume:
+        return None, {}
+
+    journal = Journal(out_path + ".journal.jsonl")
+    return journal, journal.load()
+
+
+def restore_from_journal(
+    term: str,
+    records: dict,
+    data: dict,
+    unfound: list,
+    scraped_at=None,
+) -> bool:
+    """
+    Returns True if the <term> was already finished on a previous run,
+    in which case its journaled result is put back into <data> or <unfound>
+    (and its timestamp into <scraped_at>).
+    Terms that threw exceptions are scraped again.
+    """
+    record = records.get(term)
+    if record is None or record["status"] == EXCEPTION:
+        return False
+
+    if record["status"] == FOUND:
+        data[term] = record["data"]
+        if scraped_at is not None:
+            scraped_at[term] = record.get("scraped-at")
+    else:
+        unfound.append(term)
+    return True
+
+
+def _write_json(obj, path: str, indent=4):
+    # Writes to a temporary file first so that an interruption
+    # never leaves a half-written JSON behind.
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as json_file:
+        write_json(obj, json_file, indent=indent)
+    os.replace(temp_path, path)
+
+
+def save_json(
+    data: dict,
+    out_path: str,
+    scraped_at=None,
+    unfound=None,
+    exceptionals=None,
+):
+    """
+    Saves the <data> to the <out_path> JSON, and saves when each term
+    was scraped (along with the terms that failed)
+    to the <out_path>.meta.json file next to it.
+    """
+    _write_json(data, out_path)
+
+    if scraped_at is not None:
+        meta = {
+            "scraped-at": {term: scraped_at.get(term) for term in data.keys()},
+            "unfound": unfound if unfound is not None else [],
+            "exceptionals": exceptionals if exceptionals is not None else [],
+        }
+        _write_json(meta, out_path + ".meta.json")
+
+
+def print_progress(
+    term: str,
+    word_info: list,
+    num_done: int,
+    num_terms: int,
+    start_time: float,
+    limiter=None,
+):
+    """
+    Prints the scraped info and how much time is remaining,
+    along with the current request rate if an adaptive <limiter>
+    (or a Politeness policy) is given.
+    """
+    percent_done = int(num_done / num_terms * 100)
+    elapsed = time.time() - start_time
+    elapsed_per_entry = elapsed / num_done  # avg
+    num_remaining = num_terms - num_done
+    remaining_time = int(num_remaining * elapsed_per_entry)
+    hours = remaining_time // 3600
+    remaining_time %= 3600
+    minutes = remaining_time // 60
+    remaining_time %= 60
+    seconds = remaining_time
+
+    print("\n" * 6)
+    print(dumps_json(word_info[0], indent=4))
+    rate_str = ""
+    if hasattr(limiter, "current_rate"):
+        rate_str = f" ({limiter.current_rate:.2f} req/s)"
+    print(f"{percent_done:> 2d}% [{hours}:{minutes:02}:{seconds:02}] {term}{rate_str}")
+
+
+def finish_run(
+    data: dict,
+    unfound: list,
+    exceptionals: list,
+    out_path: str,
+    cache=None,
+    verbose: bool = True,
+    journal=None,
+    scraped_at=None,
+) -> dict:
+    """
+    Prints everything that went wrong (if anything),
+    saves the <data> to the <out_path> JSON (with the <scraped_at> timestamps
+    next to it) and returns it.
+    The <journal> is deleted once its contents are saved.
+    """
     if verbose and len(exceptionals) > 0:
         print("These terms threw exceptions:")
         for x in exceptionals:
@@ -130,9 +225,219 @@ def scrape_all(
             print(f"\t{u}")
         print("\n", end="")
 
+    if verbose and cache is not None:
+        stats = ", ".join(f"{k}: {v}" for k, v in cache.stats.items())
+        print(f"Page cache ({stats})\n")
+
     # Save the dictionary to a file.
     if out_path is not None:
-        with open(out_path, "w", encoding="utf-8") as json_file:
-            json.dump(data, json_file, ensure_ascii=False, indent=4)
+        save_json(data, out_path, scraped_at, unfound, exceptionals)
+    if journal is not None:
+        journal.remove()
+
+    # Results held in the compact model are handed back as dicts.
+    for term, word_info in data.items():
+        data[term] = to_results(word_info)
+
+    return data
+
+
+def scrape_all(
+    out_path="jp-data.json",
+    in_path="n5.txt",
+    words=None,
+    sleep_seconds=0.1,
+    error_sleep_seconds=20,
+    verbose: bool = True,
+    cache=None,
+    pool_size: int = 10,
+    timeout=DEFAULT_TIMEOUT,
+    adaptive: bool = True,
+    max_requests_per_second=5.0,
+    resume: bool = True,
+    checkpoint_every: int = 100,
+    refresh: bool = False,
+    max_age_days=None,
+    fetcher=None,
+    negative_cache=None,
+    prequery: bool = False,
+    politeness=None,
+):
+    """
+    Takes either an <in_path> specifying a .txt file to load terms from,
+    or takes a list of <words> directly, then saves the scraped
+    results as a single dictionary to the <out_path> JSON.
+
+    If a PageCache is given as <cache>, pages that were already
+    downloaded on a previous run are read from disk instead.
+
+    Every request goes through one pooled keep-alive session, holding up to
+    <pool_size> connections, with each request using the given
+    (connect, read) <timeout> in seconds.
+
+    If a NegativeCache is given as <negative_cache>, pages that were missing
+    on a previous run aren't requested again, and conjugations go straight
+    to the dictionary form they were resolved to before.
+
+    If <prequery> is True, every term is first looked up with batched
+    MediaWiki queries (50 terms per request), so that missing pages are
+    never requested and terms that redirect to the same page share one fetch.
+
+    If <adaptive>, requests are paced by an AdaptiveRateController,
+    which speeds up to <max_requests_per_second> while Wiktionary responds
+    normally and backs off when it answers with 429/503.
+    Otherwise, the program sleeps around <sleep_seconds> between terms
+    and around <error_sleep_seconds> every 20 terms.
+    If a Politeness policy is given as <politeness>, it paces every request
+    instead (and can be shared with other threads or processes).
+
+    Every finished term is appended to a journal next to the <out_path>,
+    so if <resume> is True, a run that was interrupted skips the terms
+    it already finished. The <out_path> JSON is also saved every
+    <checkpoint_every> terms, and the journal is deleted
+    once the final JSON has been saved.
+
+    If <refresh> is True, the results already saved in the <out_path> JSON
+    are kept, and only terms that are new, failed last time or were scraped
+    more than <max_age_days> ago are scraped again. The time each term was
+    scraped is saved in the <out_path>.meta.json file.
+
+    If a <fetcher> (such as a CassetteFetcher) is given, every page
+    is fetched from it instead, and the program doesn't sleep at all;
+    any pacing is left to the fetcher's own limiter.
+
+    Pages that several terms lead to (such as the とる page that
+    撮る and 取る both refer to) are only fetched and parsed once per run.
+    """
+    PATIENCE = sleep_seconds
+
+    terms = load_terms(in_path, words)
+    journal, records = open_journal(out_path, resume)
+    if refresh:
+        records = {**load_previous_run(out_path, max_age_days), **records}
+
+    start_time = time.time()
+    owns_fetcher = fetcher is None
+    sleeps = owns_fetcher and not adaptive and politeness is None
+    if owns_fetcher:
+        limiter = politeness
+        if limiter is None and adaptive:
+            limiter = AdaptiveRateController(max_rate=max_requests_per_second)
+        fetcher = CachedFetcher(
+            cache,
+            timeout=timeout,
+            limiter=limiter,
+            pool_size=pool_size,
+            negative_cache=negative_cache,
+        )
+
+    # Pages that several terms lead to are only fetched and parsed once.
+    shared_fetcher = SingleFlightFetcher(fetcher)
+    try:
+        if prequery:
+            shared_fetcher.prequery(
+                [t for t in terms if not restore_from_journal(t, records, {}, [])]
+            )
+
+        # Collects data into one dictionary.
+        # Any terms that throw errors will be saved to their own text files.
+        data = {}
+        scraped_at = {}
+        unfound = []
+        exceptionals = []
+        num_scraped = 0
+        for i, term in enumerate(terms):
+            if restore_from_journal(term, records, data, unfound, scraped_at):
+                # Only the compact copy of the journaled result is kept.
+                records.pop(term)
+                if term in data:
+                    data[term] = to_model(data[term])
+                continue
+
+            try:
+                if num_scraped > 0 and sleeps:
+                    if i % 20 == 0:
+                        # Sleeps for a little while every 20 terms.
+                        sleep_length = random.uniform(
+                            error_sleep_seconds * 0.75,
+                            error_sleep_seconds * 1.25,
+                        )
+                    else:
+                        sleep_length = random.uniform(
+                            PATIENCE * 0.75,
+                            PATIENCE * 1.5,
+                        )
+                    time.sleep(sleep_length)
+
+                # Scrapes.
+                word_info = scrape(
+                    term,
+                    re_sleep_seconds=sleep_seconds if sleeps else 0,
+                    error_sleep_seconds=error_sleep_seconds,
+                    fetcher=shared_fetcher,
+                    as_model=True,
+                )
+                num_scraped += 1
+                scraped_at[term] = timestamp()
+                if word_info and len(word_info) > 0:
+                    if verbose:
+                        print_progress(
+                            term,
+                            word_info,
+                            i + 1,
+                            len(terms),
+                            start_time,
+                            fetcher.limiter,
+                        )
+
+                    # Adds the entry to the dictionary,
+                    # held in the compact model until the run is finished.
+                    data[term] = word_info
+                    if journal is not None:
+                        journal.append(term, FOUND, word_info, scraped_at[term])
+
+                else:
+                    if verbose:
+                        print(f"No data saved for {term}!")
+                    unfound.append(term)
+                    if journal is not None:
+                        journal.append(term, UNFOUND, scraped_at=scraped_at[term])
+
+                if out_path is not None and num_scraped % checkpoint_every == 0:
+                    save_json(data, out_path, scraped_at, unfound, exceptionals)
+
+            except KeyboardInterrupt:
+                if verbose:
+                    print("Keyboard interrupt received, exiting gracefully.")
+                    if journal is not None:
+                        print(f"Finished terms are saved in {journal.path}.")
+                raise
+
+            except Exception as e:
+                if verbose:
+                    print(
+                        "################################\n"
+                        + f"EXCEPTION {e} from term {term}\n"
+                        + "################################\n"
+                    )
+                exceptionals.append(term)
+                if journal is not None:
+                    journal.append(term, EXCEPTION)
+    finally:
+        # Everything is closed even if the run is interrupted.
+        shared_fetcher.close()
+        if owns_fetcher:
+            fetcher.close()
+        if journal is not None:
+            journal.close()
 
-    return data
\ No newline at end of file
+    return finish_run(
+        data,
+        unfound,
+        exceptionals,
+        out_path,
+        cache,
+        verbose,
+        journal,
+        scraped_at,
+    )
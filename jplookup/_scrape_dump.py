@@ -0,0 +1,238 @@
+"""
+Filename: jplookup._scrape_dump.py
+Author: TravisGK
+Date: 2025-03-22
+
+Description: This file defines functions that build jplookup results
+             from a local Wiktionary HTML dump (such as the Wikimedia
+             Enterprise HTML dumps, given as .ndjson, .ndjson.gz or .tar.gz)
+             without making a single request to Wiktionary.
+
+             The dump is streamed once and every page with a Japanese
+             section is saved to a local page index (a PageCache that
+             never expires), along with the redirects to it.
+             The usual scrape(...) pipeline is then run on the pages
+             across multiple processes, with every page it asks for
+             (dictionary forms, embedded kanji and alternative spellings)
+             being read from the same index.
+
+Version: 1.0
+License: MIT
+"""
+
+import gzip
+import json
+import multiprocessing
+import re
+import tarfile
+import time
+from jplookup._cleanstr.removal import shorten_html
+from jplookup._scrape.scrape import scrape
+from jplookup._scrape._fetch.fetchers import CachedFetcher
+from jplookup._scrape._fetch.page_cache import PageCache
+from jplookup._scrape_all import print_progress, finish_run
+
+# Enterprise dumps hold Parsoid HTML, whose headers aren't wrapped
+# in the <div class="mw-heading ..."> that the scraper looks for.
+_HEADING_PATTERN = re.compile(r"<h([2-6])\b[^>]*>.*?</h\1>", re.DOTALL)
+
+# The number of pages saved to the index per transaction.
+_BATCH_SIZE = 500
+
+# The offline fetcher of each worker process, reading from the page index.
+_worker_fetcher = None
+
+
+def _iter_lines(dump_path: str):
+    """Yields each line of the NDJSON files in the dump at <dump_path>."""
+    if dump_path.endswith((".tar.gz", ".tgz", ".tar")):
+        with tarfile.open(dump_path, "r|*") as archive:
+            for member in archive:
+                if not member.isfile():
+                    continue
+                for line in archive.extractfile(member):
+                    yield line.decode("utf-8", errors="replace")
+    elif dump_path.endswith(".gz"):
+        with gzip.open(dump_path, "rt", encoding="utf-8") as file:
+            yield from file
+    else:
+        with open(dump_path, "r", encoding="utf-8") as file:
+            yield from file
+
+
+def iter_dump_pages(dump_path: str):
+    """
+    Yields a (title, html, redirects) tuple for every article
+    in the dump at <dump_path> that has a Japanese section.
+    """
+    for line in _iter_lines(dump_path):
+        if "Japanese" not in line:
+            continue  # skips decoding most pages.
+
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+
+        namespace = record.get("namespace", {}).get("identifier", 0)
+        html = record.get("article_body", {}).get("html", "")
+        if namespace != 0 or 'id="Japanese"' not in html:
+            continue
+
+        redirects = [r["name"] for r in record.get("redirects", []) if "name" in r]
+        yield record["name"], html, redirects
+
+
+def to_rendered_html(html: str) -> str:
+    """
+    Returns the given page HTML with each header wrapped
+    the same way as on the pages that Wiktionary serves.
+    """
+    if 'class="mw-heading' in html:
+        return html
+
+    return _HEADING_PATTERN.sub(
+        lambda m: f'<div class="mw-heading mw-heading{m.group(1)}">'
+        + m.group(0)
+        + "</div>",
+        html,
+    )
+
+
+def build_dump_index(
+    dump_path: str,
+    index_path: str = "jp-dump.sqlite3",
+    verbose: bool = True,
+) -> list:
+    """
+    Streams through the dump at <dump_path>, saves every page
+    with a Japanese section to the page index at <index_path>
+    and returns the titles of the saved pages.
+    """
+    index = PageCache(index_path, ttl_seconds=None)
+    titles = []
+    aliases = []
+    batch = []
+    start_time = time.time()
+
+    for title, html, redirects in iter_dump_pages(dump_path):
+        batch.append((title, shorten_html(to_rendered_html(html))))
+        aliases.extend((redirect, title) for redirect in redirects)
+        titles.append(title)
+
+        if len(batch) >= _BATCH_SIZE:
+            index.put_many(batch)
+            batch = []
+            if verbose:
+                print(f"Indexed {len(titles)} pages ({time.time() - start_time:.0f}s)")
+
+    index.put_many(batch)
+    index.put_aliases(aliases)
+    index.close()
+
+    if verbose:
+        print(f"Indexed {len(titles)} pages and {len(aliases)} redirects.\n")
+
+    return titles
+
+
+def _open_worker_index(index_path: str):
+    # Each process needs its own connection to the page index.
+    global _worker_fetcher
+    index = PageCache(index_path, ttl_seconds=None)
+    _worker_fetcher = CachedFetcher(index, offline=True)
+
+
+def _scrape_offline(term: str):
+    """
+    Returns the <term> along with its scraped results
+    (or the exception it threw) using only the worker's page index.
+    """
+    try:
+        word_info = scrape(
+            term,
+            re_sleep_seconds=0,
+            verbose=False,
+            fetcher=_worker_fetcher,
+            as_model=True,
+        )
+    except Exception as e:
+        return term, e
+    return term, word_info
+
+
+def scrape_dump(
+    dump_path=None,
+    index_path: str = "jp-dump.sqlite3",
+    out_path="jp-data.json",
+    words=None,
+    processes=None,
+    verbose: bool = True,
+) -> dict:
+    """
+    Scrapes terms from a local Wiktionary dump instead of the website
+    and saves the results as a single dictionary to the <out_path> JSON.
+
+    Parameters:
+        dump_path (str): the .ndjson, .ndjson.gz or .tar.gz dump to index.
+                         If None, the existing index at <index_path> is used.
+        index_path (str): the SQLite page index the dump is saved to.
+        out_path (str): the JSON file the results are saved to.
+        words (list): the terms to scrape; if None,
+                      every Japanese page in the index is scraped.
+        processes (int): the number of worker processes
+                         (the number of CPUs if None).
+        verbose (bool): if False, nothing will be printed.
+
+    On Windows and macOS, this must be called from within
+    an if __name__ == "__main__": block.
+    """
+    titles = None
+    if dump_path is not None:
+        titles = build_dump_index(dump_path, index_path, verbose)
+
+    if words is not None:
+        # Each term is only scraped once, in the order it was first given.
+        terms = list(dict.fromkeys(words))
+    elif titles is not None:
+        terms = titles
+    else:
+        index = PageCache(index_path, ttl_seconds=None)
+        terms = [t.replace("_", " ") for t in index.titles()]
+        index.close()
+
+    start_time = time.time()
+    results = {}
+    with multiprocessing.Pool(
+        processes,
+        initializer=_open_worker_index,
+        initargs=(index_path,),
+    ) as pool:
+        for term, word_info in pool.imap_unordered(
+            _scrape_offline,
+            terms,
+            chunksize=16,
+        ):
+            results[term] = word_info
+            if (
+                verbose
+                and not isinstance(word_info, Exception)
+                and word_info
+                and len(word_info) > 0
+            ):
+                print_progress(term, word_info, len(results), len(terms), start_time)
+
+    # Collects data into one dictionary in the original order of the terms.
+    data = {}
+    unfound = []
+    exceptionals = []
+    for term in terms:
+        word_info = results.get(term)
+        if isinstance(word_info, Exception):
+            exceptionals.append(term)
+        elif word_info and len(word_info) > 0:
+            data[term] = word_info
+        else:
+            unfound.append(term)
+
+    return finish_run(data, unfound, exceptionals, out_path, verbose=verbose)
@@ -0,0 +1,299 @@
+"""
+Filename: jplookup._scrape_pipeline.py
+Author: TravisGK
+Date: 2025-03-22
+
+Description: This file defines a pipelined counterpart of scrape_all(...)
+             which keeps network I/O and parsing apart:
+             an I/O stage of threads fetches the raw HTML of every page,
+             while a stage of processes runs the shortening, parsing
+             and postprocessing on all CPU cores.
+
+             A term's pages are handed to a process once they've been
+             fetched; if parsing them turns up more pages that are needed
+             (alternative spellings, embedded kanji or a dictionary form),
+             those are fetched and the term is parsed again.
+             Both stages only hold a bounded number of terms at a time,
+             so a slow stage holds back the one feeding it.
+
+             Every finished term is journaled the same way
+             as with scrape_all(...), so an interrupted run can resume.
+
+Version: 1.0
+License: MIT
+"""
+
+import os
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+import requests
+from jplookup._cleanstr.removal import shorten_html
+from jplookup._journal import FOUND, UNFOUND, EXCEPTION
+from jplookup._model import to_model
+from jplookup._scrape.scrape import scrape
+from jplookup._scrape._fetch.fetchers import (
+    CachedFetcher,
+    PagesNeeded,
+    PrefetchedFetcher,
+)
+from jplookup._scrape._fetch.page_cache import normalize_title
+from jplookup._scrape._fetch.rate_limit import (
+    THROTTLE_STATUS_CODES,
+    AdaptiveRateController,
+    parse_retry_after,
+)
+from jplookup._scrape._fetch.single_flight import SingleFlightFetcher
+from jplookup._scrape_all import (
+    finish_run,
+    load_terms,
+    open_journal,
+    print_progress,
+    restore_from_journal,
+    timestamp,
+)
+
+MAX_FETCH_ATTEMPTS = 5
+
+
+def _fetch_pages(fetcher, titles: list, error_sleep_seconds) -> dict:
+    """
+    Returns a dict mapping the normalized <titles> to the
+    (status code, text) of their pages.
+    Throttled requests and connection errors are tried again,
+    and an HTTPError is raised if a page is still throttled
+    after the last attempt.
+    """
+    pages = {}
+    for title in titles:
+        for num_attempts in range(1, MAX_FETCH_ATTEMPTS + 1):
+            try:
+                page = fetcher.fetch(title)
+            except requests.exceptions.RequestException:
+                if num_attempts == MAX_FETCH_ATTEMPTS:
+                    raise
+                time.sleep(error_sleep_seconds)
+                continue
+
+            if page.status_code in THROTTLE_STATUS_CODES:
+                if num_attempts == MAX_FETCH_ATTEMPTS:
+                    raise requests.exceptions.HTTPError(
+                        f"Error {page.status_code}: "
+                        f"Wiktionary kept throttling requests for {title}."
+                    )
+                if fetcher.limiter is None:
+                    retry_after = parse_retry_after(page.retry_after)
+                    time.sleep(
+                        error_sleep_seconds if retry_after is None else retry_after
+                    )
+                continue
+            break
+
+        # The pages are shortened by the parsing processes.
+        pages[normalize_title(title)] = (page.status_code, page.text)
+
+    return pages
+
+
+def _parse_term(term: str, pages: dict):
+    """
+    Returns ("done", results) with the scrape(...) results of the <term>
+    made from the given <pages>, or ("need", (titles, pages)) with the titles
+    of pages that have to be fetched first and the <pages> shortened,
+    so that they're sent back to the next process already cut down.
+    """
+    pages = {
+        title: (status_code, shorten_html(text))
+        for title, (status_code, text) in pages.items()
+    }
+    try:
+        word_info = scrape(
+            term,
+            re_sleep_seconds=0,
+            error_sleep_seconds=0,
+            verbose=False,
+            fetcher=PrefetchedFetcher(pages),
+            as_model=True,
+        )
+    except PagesNeeded as e:
+        return "need", (list(dict.fromkeys(e.titles)), pages)
+    return "done", word_info
+
+
+def scrape_pipeline(
+    out_path="jp-data.json",
+    in_path="n5.txt",
+    words=None,
+    fetcher=None,
+    cache=None,
+    processes=None,
+    io_workers: int = 4,
+    max_in_flight=None,
+    max_requests_per_second=5.0,
+    error_sleep_seconds=20,
+    resume: bool = True,
+    verbose: bool = True,
+) -> dict:
+    """
+    Takes either an <in_path> specifying a .txt file to load terms from,
+    or takes a list of <words> directly, then saves the scraped
+    results as a single dictionary to the <out_path> JSON,
+    the same as scrape_all(...) would.
+
+    Parameters:
+        fetcher (Fetcher): where pages are fetched from; if None,
+                           a CachedFetcher using the <cache> is made
+                           and paced by an AdaptiveRateController
+                           of up to <max_requests_per_second>.
+        processes (int): the number of parsing processes
+                         (the number of CPUs if None).
+        io_workers (int): the number of threads fetching pages.
+        max_in_flight (int): the most terms being fetched or parsed
+                             at the same time (4 per process if None).
+        error_sleep_seconds: the duration in seconds that an I/O thread
+                             sleeps after a connection error.
+        resume (bool): if True, the terms already in the journal
+                       next to the <out_path> (from a run that was
+                       interrupted) are skipped.
+        verbose (bool): if False, nothing will be printed.
+
+    On Windows and macOS, this must be called from within
+    an if __name__ == "__main__": block.
+    """
+    terms = load_terms(in_path, words)
+    journal, records = open_journal(out_path, resume)
+    owns_fetcher = fetcher is None
+    if owns_fetcher:
+        fetcher = CachedFetcher(
+            cache,
+            limiter=AdaptiveRateController(max_rate=max_requests_per_second),
+            pool_size=io_workers,
+        )
+
+    # Pages that several terms lead to are only fetched once.
+    shared_fetcher = SingleFlightFetcher(fetcher)
+    start_time = time.time()
+    results = {}
+    scraped_at = {}
+    pages_of = {}
+    fetches = {}
+    parses = {}
+    next_term_index = 0
+
+    # Terms finished on a previous run are put back as they were.
+    journaled, journaled_unfound = {}, []
+    for term in terms:
+        restore_from_journal(term, records, journaled, journaled_unfound, scraped_at)
+    for term, word_info in journaled.items():
+        results[term] = to_model(word_info)
+    for term in journaled_unfound:
+        results[term] = None
+
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if max_in_flight is None:
+        max_in_flight = 4 * processes
+    io_pool = ThreadPoolExecutor(io_workers)
+    cpu_pool = ProcessPoolExecutor(processes)
+
+    def submit_fetch(term: str, titles: list):
+        future = io_pool.submit(
+            _fetch_pages,
+            shared_fetcher,
+            titles,
+            error_sleep_seconds,
+        )
+        fetches[future] = term
+
+    try:
+        while next_term_index < len(terms) or len(fetches) + len(parses) > 0:
+            # New terms are only let in while there's room for them.
+            while next_term_index < len(terms) and len(pages_of) < max_in_flight:
+                term = terms[next_term_index]
+                next_term_index += 1
+                if term in pages_of or term in results:
+                    continue  # the same term was given twice.
+                pages_of[term] = {}
+                submit_fetch(term, [term])
+
+            done, _ = wait(list(fetches) + list(parses), return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in fetches:
+                    term = fetches.pop(future)
+                    try:
+                        pages_of[term].update(future.result())
+                    except Exception as e:
+                        results[term] = e
+                        del pages_of[term]
+                        continue
+                    parses[cpu_pool.submit(_parse_term, term, pages_of[term])] = term
+                    continue
+
+                term = parses.pop(future)
+                try:
+                    status, value = future.result()
+                except Exception as e:
+                    status, value = "done", e
+
+                if status == "need":
+                    titles, pages_of[term] = value
+                    if all(normalize_title(t) in pages_of[term] for t in titles):
+                        value = RuntimeError(f"Pages of {term} kept going missing.")
+                    else:
+                        submit_fetch(term, titles)
+                        continue
+
+                results[term] = value
+                del pages_of[term]
+                scraped_at[term] = timestamp()
+                if journal is not None:
+                    if isinstance(value, Exception):
+                        journal.append(term, EXCEPTION)
+                    elif value:
+                        journal.append(term, FOUND, value, scraped_at[term])
+                    else:
+                        journal.append(term, UNFOUND, scraped_at=scraped_at[term])
+                if verbose and not isinstance(value, Exception) and value:
+                    print_progress(term, value, len(results), len(terms), start_time)
+    finally:
+        io_pool.shutdown(wait=True, cancel_futures=True)
+        cpu_pool.shutdown(wait=True, cancel_futures=True)
+        shared_fetcher.close()
+        if owns_fetcher:
+            fetcher.close()
+        if journal is not None:
+            journal.close()
+
+    # Collects data into one dictionary in the original order of the terms.
+    data = {}
+    unfound = []
+    exceptionals = []
+    for term in dict.fromkeys(terms):
+        word_info = results.get(term)
+        if isinstance(word_info, Exception):
+            if verbose:
+                print(
+                    "################################\n"
+                    + f"EXCEPTION {word_info} from term {term}\n"
+                    + "################################\n"
+                )
+            exceptionals.append(term)
+        elif word_info and len(word_info) > 0:
+            data[term] = word_info
+        else:
+            unfound.append(term)
+
+    return finish_run(
+        data,
+        unfound,
+        exceptionals,
+        out_path,
+        cache,
+        verbose,
+        journal,
+        scraped_at,
+    )
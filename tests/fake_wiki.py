@@ -0,0 +1,154 @@
+"""
+Filename: tests.fake_wiki.py
+Author: TravisGK
+Date: 2025-03-22
+
+Description: This file defines FakeWiki, a stand-in for Wiktionary
+             served over HTTP on the local machine, which the tests
+             point the <url> and <api_url> of the fetchers at.
+
+Version: 1.0
+License: MIT
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+
+def _heading(language: str) -> str:
+    return (
+        '<div class="mw-heading mw-heading2">'
+        + f'<h2 id="{language}">{language}</h2></div>'
+    )
+
+
+class FakeWiki:
+    """
+    Serves the given <pages>, which map titles to lists of
+    (language, html) sections, as full pages at /wiki/<title>
+    and through the parse and query actions of the API at /w/api.php.
+
+    Every request made is kept in <requests> as a tuple:
+    ("wiki", title), ("parse", title, prop) or ("query", titles).
+    """
+
+    def __init__(self, pages: dict):
+        self.pages = pages
+        self.requests = []
+
+        # The status code that every parse request is answered with.
+        self.parse_status = 200
+
+        # If True, the sections are given as coming from another page
+        # (such as "T-1"), which the parse API can't render by index.
+        self.transcluded = False
+
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.server.wiki = self
+        host, port = self.server.server_address
+        self.url = f"http://{host}:{port}/wiki/"
+        self.api_url = f"http://{host}:{port}/w/api.php"
+        self._thread = threading.Thread(
+            target=self.server.serve_forever,
+            kwargs={"poll_interval": 0.01},
+            daemon=True,
+        )
+        self._thread.start()
+
+    def record(self, request: tuple):
+        with self._lock:
+            self.requests.append(request)
+
+    def requested(self, kind: str) -> list:
+        """Returns every request of the given <kind> made so far."""
+        with self._lock:
+            return [r for r in self.requests if r[0] == kind]
+
+    def full_page(self, title: str) -> str:
+        """Returns the HTML of the whole page of the <title>."""
+        body = "".join(
+            _heading(language) + html for language, html in self.pages[title]
+        )
+        return (
+            "<html><body>"
+            + '<div class="mw-content-ltr mw-parser-output">'
+            + body
+            + "</div></body></html>"
+        )
+
+    def section(self, title: str, index: int) -> str:
+        """Returns the rendered HTML of the section at the <index>."""
+        language, html = self.pages[title][index - 1]
+        return (
+            '<div class="mw-content-ltr mw-parser-output">'
+            + _heading(language)
+            + html
+            + "</div>"
+        )
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self._thread.join()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status_code: int, body: str, content_type="text/html"):
+        data = body.encode("utf-8")
+        self.send_response(status_code)
+        self.send_header("Content-Type", f"{content_type}; charset=UTF-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_json(self, obj):
+        self._send(200, json.dumps(obj, ensure_ascii=False), "application/json")
+
+    def do_GET(self):
+        wiki = self.server.wiki
+        url = urlparse(self.path)
+
+        if url.path.startswith("/wiki/"):
+            title = unquote(url.path[len("/wiki/") :])
+            wiki.record(("wiki", title))
+            if title in wiki.pages:
+                self._send(200, wiki.full_page(title))
+            else:
+                self._send(404, "<html><body></body></html>")
+            return
+
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        if params.get("action") == "query":
+            titles = params["titles"].split("|")
+            wiki.record(("query", titles))
+            pages = []
+            for title in titles:
+                page = {"ns": 0, "title": title}
+                if title not in wiki.pages:
+                    page["missing"] = True
+                pages.append(page)
+            self._send_json({"batchcomplete": True, "query": {"pages": pages}})
+            return
+
+        title = params["page"]
+        wiki.record(("parse", title, params["prop"]))
+        if wiki.parse_status != 200:
+            self._send(wiki.parse_status, "")
+        elif title not in wiki.pages:
+            self._send_json({"error": {"code": "missingtitle"}})
+        elif params["prop"] == "sections":
+            prefix = "T-" if wiki.transcluded else ""
+            sections = [
+                {"level": "2", "line": language, "index": f"{prefix}{i}"}
+                for i, (language, _) in enumerate(wiki.pages[title], 1)
+            ]
+            self._send_json({"parse": {"title": title, "sections": sections}})
+        else:
+            text = wiki.section(title, int(params["section"]))
+            self._send_json({"parse": {"title": title, "text": text}})
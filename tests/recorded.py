@@ -0,0 +1,41 @@
+"""
+Filename: tests.recorded.py
+Author: TravisGK
+Date: 2025-03-22
+
+Description: This file points the tests at the pages recorded
+             in tests/cassette (by a CassetteFetcher) and at the results
+             that jplookup.scrape(...) is expected to give for them,
+             which are kept in tests/expected.json.
+
+             The expected results were made by the scraper as it was
+             before any of the parsing was sped up, so any change
+             to the output of the faster parsing shows up as a failure.
+
+Version: 1.0
+License: MIT
+"""
+
+import json
+import os
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+CASSETTE_DIR = os.path.join(TESTS_DIR, "cassette")
+EXPECTED_PATH = os.path.join(TESTS_DIR, "expected.json")
+
+
+def load_expected() -> dict:
+    """Returns a dict mapping each term to its expected scrape(...) results."""
+    with open(EXPECTED_PATH, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def load_pages() -> dict:
+    """Returns a dict mapping the term of every recorded page to its HTML."""
+    pages = {}
+    for name in os.listdir(CASSETTE_DIR):
+        with open(os.path.join(CASSETTE_DIR, name), "r", encoding="utf-8") as file:
+            recorded = json.load(file)
+        if recorded["status-code"] == 200:
+            pages[recorded["term"]] = recorded["text"]
+    return pages
@@ -0,0 +1,68 @@
+"""
+Filename: tests.test_ascrape_all.py
+Author: TravisGK
+Date: 2025-03-22
+
+Description: This file tests that ascrape_all(...) gives the results
+             in tests/expected.json when replaying tests/cassette,
+             and that its journal is written off the event loop.
+
+Version: 1.0
+License: MIT
+"""
+
+import asyncio
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+from recorded import CASSETTE_DIR, load_expected
+import jplookup
+from jplookup._journal import Journal
+
+
+class AscrapeAllTest(unittest.TestCase):
+    def setUp(self):
+        self.expected = load_expected()
+        self.fetcher = jplookup.CassetteFetcher(CASSETTE_DIR)
+
+        # ascrape_all(...) makes its own fetcher, which is the cassette.
+        patch = mock.patch(
+            "jplookup._ascrape_all.CachedFetcher", lambda *a, **k: self.fetcher
+        )
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def test_journal_is_written_off_the_event_loop(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        out_path = os.path.join(directory.name, "jp-data.json")
+
+        writers = []
+        append = Journal.append
+
+        def record_writer(*args, **kwargs):
+            writers.append(threading.current_thread())
+            return append(*args, **kwargs)
+
+        with mock.patch.object(Journal, "append", record_writer):
+            data = asyncio.run(
+                jplookup.ascrape_all(
+                    out_path=out_path,
+                    words=list(self.expected),
+                    requests_per_second=1000.0,
+                    burst=100,
+                    verbose=False,
+                )
+            )
+
+        found = {t: r for t, r in self.expected.items() if r is not None}
+        self.assertEqual(data, found)
+        self.assertEqual(list(data), list(found))
+        self.assertEqual(len(writers), len(self.expected))
+        self.assertNotIn(threading.main_thread(), writers)
+
+
+if __name__ == "__main__":
+    unittest.main()
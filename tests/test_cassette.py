@@ -0,0 +1,65 @@
+"""
+Filename: tests.test_cassette.py
+Author: TravisGK
+Date: 2025-03-22
+
+Description: This file tests that the pages recorded in tests/cassette
+             are replayed by a CassetteFetcher through scrape(...)
+             and scrape_all(...) without any network access,
+             giving the results in tests/expected.json.
+
+Version: 1.0
+License: MIT
+"""
+
+import unittest
+from unittest import mock
+import requests
+from recorded import CASSETTE_DIR, load_expected
+import jplookup
+
+
+def _no_network(*args, **kwargs):
+    raise AssertionError("A replayed run tried to make a request.")
+
+
+class CassetteTest(unittest.TestCase):
+    def setUp(self):
+        self.expected = load_expected()
+        patches = [
+            mock.patch.object(requests.Session, "send", _no_network),
+            mock.patch.object(requests, "get", _no_network),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_scrape_replays_the_cassette(self):
+        with jplookup.CassetteFetcher(CASSETTE_DIR) as fetcher:
+            for term, expected in self.expected.items():
+                with self.subTest(term=term):
+                    results = jplookup.scrape(
+                        term,
+                        re_sleep_seconds=0,
+                        error_sleep_seconds=0,
+                        verbose=False,
+                        fetcher=fetcher,
+                    )
+                    self.assertEqual(results, expected)
+
+    def test_scrape_all_replays_the_cassette(self):
+        with jplookup.CassetteFetcher(CASSETTE_DIR) as fetcher:
+            data = jplookup.scrape_all(
+                out_path=None,
+                words=list(self.expected),
+                verbose=False,
+                fetcher=fetcher,
+            )
+
+        found = {term: r for term, r in self.expected.items() if r is not None}
+        self.assertEqual(data, found)
+        self.assertEqual(list(data), list(found))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+"""
+Filename: tests.test_html_parsers.py
+Author: TravisGK
+Date: 2025-03-22
+
+Description: This file tests that scrape_html(...) gives the results
+             in tests/expected.json for every page in tests/cassette
+             with each HTML parser backend, and that snippets
+             are still parsed with html.parser under lxml.
+
+Version: 1.0
+License: MIT
+"""
+
+import os
+import unittest
+from recorded import load_expected, load_pages
+import jplookup
+from jplookup._cleanstr.soup import _ENV_KEY
+from jplookup._cleanstr.textwork import extract_tag_contents
+
+try:
+    import lxml
+except ImportError:
+    lxml = None
+
+
+class HTMLParserTest(unittest.TestCase):
+    def setUp(self):
+        previous = os.environ.get(_ENV_KEY)
+        self.addCleanup(self.restore_parser, previous)
+
+    @staticmethod
+    def restore_parser(previous):
+        if previous is None:
+            os.environ.pop(_ENV_KEY, None)
+        else:
+            os.environ[_ENV_KEY] = previous
+
+    def check_scrape_html(self, parser: str):
+        jplookup.set_html_parser(parser)
+        pages = load_pages()
+        for term, expected in load_expected().items():
+            if term not in pages:
+                continue  # only the terms that have their own page.
+            with self.subTest(parser=parser, term=term):
+                results = jplookup.scrape_html(term, pages[term], resolver=pages.get)
+                self.assertEqual(results, expected)
+
+    def test_html_parser(self):
+        self.check_scrape_html("html.parser")
+
+    @unittest.skipIf(lxml is None, "lxml isn't installed.")
+    def test_lxml(self):
+        self.check_scrape_html("lxml")
+
+    @unittest.skipIf(lxml is None, "lxml isn't installed.")
+    def test_snippets_use_html_parser(self):
+        # lxml would close the first <li> before the second one.
+        jplookup.set_html_parser("lxml")
+        self.assertEqual(
+            extract_tag_contents("<li>a<li>b</li></li>", "li"),
+            ["<li>a<li>b</li></li>"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+"""
+Filename: tests.test_negative_cache.py
+Author: TravisGK
+Date: 2025-03-22
+
+Description: This file tests that a NegativeCache finds its records
+             under any form of a title that Wiktionary treats the same.
+
+Version: 1.0
+License: MIT
+"""
+
+import os
+import tempfile
+import unittest
+import unicodedata
+from jplookup import NegativeCache
+
+# The same conjugation, decomposed and with stray whitespace.
+TERM = "食べない"
+OTHER_FORM = " " + unicodedata.normalize("NFD", "がっこう") + " "
+
+
+class NegativeCacheTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.cache = NegativeCache(os.path.join(directory.name, "negative.sqlite3"))
+        self.addCleanup(self.cache.close)
+
+    def test_missing_pages_are_normalized(self):
+        self.cache.add_missing(OTHER_FORM)
+        self.assertTrue(self.cache.is_missing("がっこう"))
+
+    def test_dictionary_forms_are_normalized(self):
+        self.cache.add_dictionary_form(TERM + " ", "食べる")
+        self.assertEqual(self.cache.get_dictionary_form(TERM), "食べる")
+
+        self.cache.add_dictionary_form("がっこう", "学校")
+        self.assertEqual(self.cache.get_dictionary_form(OTHER_FORM), "学校")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+"""
+Filename: tests.test_politeness.py
+Author: TravisGK
+Date: 2025-03-22
+
+Description: This file tests that a shared request budget left over
+             from an earlier run starts over, and that a Politeness
+             without a path can still be sent to other processes.
+
+Version: 1.0
+License: MIT
+"""
+
+import os
+import pickle
+import sqlite3
+import tempfile
+import unittest
+import jplookup
+from jplookup._scrape._fetch.politeness import SharedRateController
+
+
+class SharedRateControllerTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "budget.sqlite3")
+
+        # An earlier run that was throttled.
+        controller = SharedRateController(self.path, initial_rate=2.0)
+        controller.report(429, "30")
+        self.assertEqual(controller.current_rate, 1.0)
+
+    def age_budget(self, seconds: float):
+        with sqlite3.connect(self.path) as connection:
+            connection.execute(
+                "UPDATE bucket SET updated = updated - ?, blocked_until = 0",
+                (seconds,),
+            )
+
+    def test_budget_in_use_is_kept(self):
+        controller = SharedRateController(self.path, initial_rate=2.0)
+        self.assertEqual(controller.current_rate, 1.0)
+
+    def test_idle_budget_starts_over(self):
+        self.age_budget(3600)
+        controller = SharedRateController(self.path, initial_rate=2.0)
+        self.assertEqual(controller.current_rate, 2.0)
+
+    def test_reset_starts_over_with_no_pause(self):
+        controller = SharedRateController(self.path, initial_rate=2.0, reset=True)
+        self.assertEqual(controller.current_rate, 2.0)
+        with sqlite3.connect(self.path) as connection:
+            (blocked_until,) = connection.execute(
+                "SELECT blocked_until FROM bucket"
+            ).fetchone()
+        self.assertEqual(blocked_until, 0)
+
+
+class PolitenessTest(unittest.TestCase):
+    def test_pickled_without_a_path_shares_a_temporary_budget(self):
+        politeness = jplookup.Politeness(max_requests_per_second=4.0)
+        politeness.report(429)
+
+        copy = pickle.loads(pickle.dumps(politeness))
+        self.assertIsNotNone(politeness.path)
+        self.assertEqual(copy.path, politeness.path)
+        self.assertEqual(copy.current_rate, 2.0)
+
+        copy.report(429)
+        self.assertEqual(politeness.current_rate, 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
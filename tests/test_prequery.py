@@ -0,0 +1,92 @@
+"""
+Filename: tests.test_prequery.py
+Author: TravisGK
+Date: 2025-03-22
+
+Description: This file tests the batched title queries of
+             scrape_all(...) and ascrape_all(...) with prequery=True:
+             titles are queried 50 at a time, missing titles
+             are saved to the negative cache and never fetched.
+
+Version: 1.0
+License: MIT
+"""
+
+import asyncio
+import functools
+import os
+import tempfile
+import unittest
+from unittest import mock
+from fake_wiki import FakeWiki
+import jplookup
+
+# Every third term has a page (with no Japanese section, so nothing is parsed).
+TERMS = [f"語{i}" for i in range(120)]
+PAGES = {term: [("English", "<p>an english section</p>")] for term in TERMS[::3]}
+MISSING = [term for term in TERMS if term not in PAGES]
+
+
+class PrequeryTest(unittest.TestCase):
+    def setUp(self):
+        self.wiki = FakeWiki(PAGES)
+        self.directory = tempfile.TemporaryDirectory()
+        path = os.path.join(self.directory.name, "negative-cache.sqlite3")
+        self.negative_cache = jplookup.NegativeCache(path)
+
+    def tearDown(self):
+        self.negative_cache.close()
+        self.wiki.close()
+        self.directory.cleanup()
+
+    def check_requests(self):
+        queries = self.wiki.requested("query")
+        self.assertEqual([len(titles) for _, titles in queries], [50, 50, 20])
+        self.assertEqual([t for _, titles in queries for t in titles], TERMS)
+
+        fetched = [title for _, title in self.wiki.requested("wiki")]
+        self.assertCountEqual(fetched, PAGES)
+        for term in MISSING:
+            self.assertTrue(self.negative_cache.is_missing(term), term)
+
+    def test_scrape_all(self):
+        fetcher = jplookup.CachedFetcher(
+            None,
+            url=self.wiki.url,
+            api_url=self.wiki.api_url,
+            negative_cache=self.negative_cache,
+        )
+        jplookup.scrape_all(
+            out_path=None,
+            words=TERMS,
+            verbose=False,
+            fetcher=fetcher,
+            prequery=True,
+        )
+        fetcher.close()
+        self.check_requests()
+
+    def test_ascrape_all(self):
+        # ascrape_all(...) makes its own CachedFetcher, pointed at the stand-in.
+        cached_fetcher = functools.partial(
+            jplookup.CachedFetcher,
+            url=self.wiki.url,
+            api_url=self.wiki.api_url,
+        )
+        with mock.patch("jplookup._ascrape_all.CachedFetcher", cached_fetcher):
+            asyncio.run(
+                jplookup.ascrape_all(
+                    out_path=None,
+                    words=TERMS,
+                    requests_per_second=1000.0,
+                    burst=100,
+                    verbose=False,
+                    negative_cache=self.negative_cache,
+                    prequery=True,
+                )
+            )
+        self.check_requests()
+
+
+if __name__ == "__main__":
+    unittest.main()
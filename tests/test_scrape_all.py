@@ -0,0 +1,86 @@
+"""
+Filename: tests.test_scrape_all.py
+Author: TravisGK
+Date: 2025-03-22
+
+Description: This file tests that scrape_all(...) closes its fetchers
+             and its journal when a run is interrupted or fails,
+             and that the interrupt isn't swallowed.
+
+Version: 1.0
+License: MIT
+"""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+from recorded import CASSETTE_DIR
+import jplookup
+from jplookup._journal import FOUND, Journal
+
+
+class InterruptedFetcher(jplookup.CassetteFetcher):
+    """Replays the cassette until the <interrupted_term> is fetched."""
+
+    def __init__(self, interrupted_term: str):
+        super().__init__(CASSETTE_DIR)
+        self.interrupted_term = interrupted_term
+        self.closed = False
+
+    def fetch(self, term: str):
+        if term == self.interrupted_term:
+            raise KeyboardInterrupt
+        return super().fetch(term)
+
+    def prequery(self, titles: list) -> dict:
+        raise RuntimeError("The title query failed.")
+
+    def close(self):
+        self.closed = True
+        super().close()
+
+
+class ScrapeAllTeardownTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.out_path = os.path.join(directory.name, "jp-data.json")
+        self.fetcher = InterruptedFetcher("コーヒー")
+
+        # scrape_all(...) makes its own fetcher, which is the stand-in.
+        patch = mock.patch(
+            "jplookup._scrape_all.CachedFetcher", lambda *a, **k: self.fetcher
+        )
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def scrape_all(self, **kwargs):
+        jplookup.scrape_all(
+            out_path=self.out_path,
+            words=["猫", "コーヒー", "一"],
+            verbose=False,
+            **kwargs,
+        )
+
+    def test_interrupt_is_raised_after_closing_everything(self):
+        with mock.patch.object(
+            Journal, "close", autospec=True, side_effect=Journal.close
+        ) as close_journal:
+            with self.assertRaises(KeyboardInterrupt):
+                self.scrape_all()
+
+        self.assertTrue(self.fetcher.closed)
+        close_journal.assert_called()
+        records = Journal(self.out_path + ".journal.jsonl").load()
+        self.assertEqual(list(records), ["猫"])
+        self.assertEqual(records["猫"]["status"], FOUND)
+
+    def test_fetcher_is_closed_when_prequery_fails(self):
+        with self.assertRaises(RuntimeError):
+            self.scrape_all(prequery=True)
+        self.assertTrue(self.fetcher.closed)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+"""
+Filename: tests.test_scrape_dump.py
+Author: TravisGK
+Date: 2025-03-22
+
+Description: This file tests that scrape_dump(...) reads the tiny
+             dump in tests/dump (in .ndjson, .ndjson.gz and .tar.gz form)
+             and gives the results in tests/expected.json for its pages.
+
+             The dump holds the pages of tests/cassette in the form
+             of Wikimedia Enterprise HTML dumps, with headers that aren't
+             wrapped in a <div class="mw-heading ...">, along with
+             pages that have to be skipped and a line that was cut off.
+
+Version: 1.0
+License: MIT
+"""
+
+import contextlib
+import gzip
+import io
+import os
+import shutil
+import tarfile
+import tempfile
+import unittest
+from recorded import TESTS_DIR, load_expected, load_pages
+import jplookup
+from jplookup._scrape._fetch.page_cache import PageCache
+from jplookup._scrape_dump import iter_dump_pages, to_rendered_html
+
+DUMP_PATH = os.path.join(TESTS_DIR, "dump", "enwiktionary.ndjson")
+TITLES = ["撮る", "取る", "とる", "コーヒー"]
+
+
+class ScrapeDumpTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def dump_paths(self) -> list:
+        """Returns the paths of the dump in every form it can be read from."""
+        gz_path = os.path.join(self.directory, "enwiktionary.ndjson.gz")
+        with open(DUMP_PATH, "rb") as file, gzip.open(gz_path, "wb") as gz_file:
+            shutil.copyfileobj(file, gz_file)
+
+        tar_path = os.path.join(self.directory, "enwiktionary.json.tar.gz")
+        with tarfile.open(tar_path, "w:gz") as archive:
+            archive.add(DUMP_PATH, arcname="enwiktionary_0.ndjson")
+
+        return [DUMP_PATH, gz_path, tar_path]
+
+    def test_reads_every_form_of_the_dump(self):
+        for dump_path in self.dump_paths():
+            with self.subTest(dump_path=os.path.basename(dump_path)):
+                pages = list(iter_dump_pages(dump_path))
+                self.assertEqual([title for title, _, _ in pages], TITLES)
+                self.assertEqual(pages[-1][2], ["コーヒ"])
+
+    def test_headers_are_wrapped_as_they_are_served(self):
+        served = load_pages()
+        for title, html, _ in iter_dump_pages(DUMP_PATH):
+            with self.subTest(title=title):
+                self.assertNotIn("mw-heading", html)
+                self.assertEqual(to_rendered_html(html), served[title])
+                self.assertEqual(to_rendered_html(served[title]), served[title])
+
+    def test_scrape_dump(self):
+        expected = load_expected()
+        index_path = os.path.join(self.directory, "jp-dump.sqlite3")
+        printed = io.StringIO()
+        with contextlib.redirect_stdout(printed):
+            data = jplookup.scrape_dump(
+                dump_path=DUMP_PATH,
+                index_path=index_path,
+                out_path=None,
+                words=["撮る", "コーヒー", "存在しない", "撮る", "とる", "存在しない"],
+                processes=1,
+            )
+
+        self.assertEqual(list(data), ["撮る", "コーヒー", "とる"])
+        for term, word_info in data.items():
+            self.assertEqual(word_info, expected[term])
+
+        # Terms given twice are only scraped (and reported) once.
+        self.assertEqual(printed.getvalue().count("\t存在しない\n"), 1)
+
+        index = PageCache(index_path, ttl_seconds=None)
+        self.addCleanup(index.close)
+        self.assertEqual(len(index), len(TITLES))
+        self.assertEqual(index.get("コーヒ").title, "コーヒー")
+
+
+if __name__ == "__main__":
+    unittest.main()
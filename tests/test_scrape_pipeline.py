@@ -0,0 +1,67 @@
+"""
+Filename: tests.test_scrape_pipeline.py
+Author: TravisGK
+Date: 2025-03-22
+
+Description: This file tests that scrape_pipeline(...) gives the results
+             in tests/expected.json when replaying tests/cassette,
+             and that it skips the terms already in its journal.
+
+Version: 1.0
+License: MIT
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+from recorded import CASSETTE_DIR, load_expected
+import jplookup
+from jplookup._journal import FOUND, Journal
+
+
+class ScrapePipelineTest(unittest.TestCase):
+    def setUp(self):
+        self.expected = load_expected()
+        self.found = {t: r for t, r in self.expected.items() if r is not None}
+        self.fetcher = jplookup.CassetteFetcher(CASSETTE_DIR)
+        self.addCleanup(self.fetcher.close)
+
+    def scrape_pipeline(self, out_path=None):
+        return jplookup.scrape_pipeline(
+            out_path=out_path,
+            words=list(self.expected),
+            fetcher=self.fetcher,
+            processes=2,
+            verbose=False,
+        )
+
+    def test_pipeline_replays_the_cassette(self):
+        data = self.scrape_pipeline()
+        self.assertEqual(data, self.found)
+        self.assertEqual(list(data), list(self.found))
+
+    def test_resumes_from_the_journal(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        out_path = os.path.join(directory.name, "jp-data.json")
+        journal = Journal(out_path + ".journal.jsonl")
+        journal.append("猫", FOUND, self.expected["猫"], "2025-03-22T00:00:00+00:00")
+        journal.close()
+
+        with mock.patch.object(
+            self.fetcher, "fetch", wraps=self.fetcher.fetch
+        ) as fetch:
+            data = self.scrape_pipeline(out_path)
+
+        fetched = [c.args[0] for c in fetch.call_args_list]
+        self.assertNotIn("猫", fetched)
+        self.assertEqual(data, self.found)
+        self.assertFalse(os.path.exists(journal.path))
+        with open(out_path, "r", encoding="utf-8") as file:
+            self.assertEqual(json.load(file), self.found)
+
+
+if __name__ == "__main__":
+    unittest.main()
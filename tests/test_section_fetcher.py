@@ -0,0 +1,105 @@
+"""
+Filename: tests.test_section_fetcher.py
+Author: TravisGK
+Date: 2025-03-22
+
+Description: This file tests that SectionFetcher gets only
+             the Japanese section of a page through the parse API,
+             and falls back on the full page when the API can't give it.
+
+Version: 1.0
+License: MIT
+"""
+
+import os
+import tempfile
+import unittest
+from fake_wiki import FakeWiki
+from jplookup import CachedFetcher, PageCache, SectionFetcher
+
+PAGES = {
+    "一": [
+        ("Translingual", "<p>the translingual section</p>"),
+        ("Chinese", "<p>the chinese section</p>"),
+        ("Japanese", "<p>the japanese section</p>"),
+    ],
+    "ペン": [("Japanese", "<p>the section of ペン</p>")],
+}
+
+
+class SectionFetcherTest(unittest.TestCase):
+    def setUp(self):
+        self.wiki = FakeWiki(PAGES)
+        self.fetcher = SectionFetcher(url=self.wiki.url, api_url=self.wiki.api_url)
+
+    def tearDown(self):
+        self.fetcher.close()
+        self.wiki.close()
+
+    def test_fetches_only_the_japanese_section(self):
+        page = self.fetcher.fetch("一")
+
+        self.assertEqual(page.status_code, 200)
+        self.assertIn("the japanese section", page.text)
+        self.assertNotIn("the chinese section", page.text)
+        self.assertEqual(
+            self.wiki.requested("parse"),
+            [("parse", "一", "sections"), ("parse", "一", "text")],
+        )
+        self.assertEqual(self.wiki.requested("wiki"), [])
+
+    def test_missing_page_is_a_404(self):
+        page = self.fetcher.fetch("存在しない語")
+
+        self.assertEqual(page.status_code, 404)
+        self.assertEqual(self.wiki.requested("wiki"), [])
+
+    def test_falls_back_on_the_full_page_after_an_api_error(self):
+        self.wiki.parse_status = 500
+        page = self.fetcher.fetch("一")
+
+        self.assertEqual(page.status_code, 200)
+        self.assertIn("the japanese section", page.text)
+        self.assertIn("the chinese section", page.text)
+        self.assertEqual(self.wiki.requested("wiki"), [("wiki", "一")])
+
+    def test_falls_back_on_the_full_page_of_a_transcluded_section(self):
+        self.wiki.transcluded = True
+        page = self.fetcher.fetch("ペン")
+
+        self.assertEqual(page.status_code, 200)
+        self.assertIn("the section of ペン", page.text)
+        self.assertEqual(
+            self.wiki.requested("parse"),
+            [("parse", "ペン", "sections")],
+        )
+        self.assertEqual(self.wiki.requested("wiki"), [("wiki", "ペン")])
+
+    def test_shares_a_cache_with_full_pages(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        cache = PageCache(os.path.join(directory.name, "pages.sqlite3"))
+        self.addCleanup(cache.close)
+        section_fetcher = SectionFetcher(
+            cache, url=self.wiki.url, api_url=self.wiki.api_url
+        )
+        full_fetcher = CachedFetcher(
+            cache, url=self.wiki.url, api_url=self.wiki.api_url
+        )
+        self.addCleanup(section_fetcher.close)
+        self.addCleanup(full_fetcher.close)
+
+        section = section_fetcher.fetch("一").text
+        full_page = full_fetcher.fetch("一").text
+        self.assertNotIn("the chinese section", section)
+        self.assertIn("the chinese section", full_page)
+
+        # Both are read back from the cache as they were saved.
+        num_requests = len(self.wiki.requests)
+        self.assertEqual(section_fetcher.fetch("一").text, section)
+        self.assertEqual(full_fetcher.fetch("一").text, full_page)
+        self.assertEqual(len(self.wiki.requests), num_requests)
+
+
+if __name__ == "__main__":
+    unittest.main()
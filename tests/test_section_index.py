@@ -0,0 +1,55 @@
+"""
+Filename: tests.test_section_index.py
+Author: TravisGK
+Date: 2025-03-22
+
+Description: This file tests that a SectionIndex finds the same tags
+             as BeautifulSoup's find_next(...), including for tag names
+             and elements that it doesn't index.
+
+Version: 1.0
+License: MIT
+"""
+
+import unittest
+from recorded import load_pages
+from jplookup._cleanstr.soup import make_soup
+from jplookup._scrape._html._section_index import INDEXED_TAGS, SectionIndex
+
+
+class SectionIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.soup = make_soup(load_pages()["猫"])
+        self.jp_header = self.soup.find("h2", id="Japanese")
+        self.index = SectionIndex(self.jp_header)
+
+    def test_indexed_tags(self):
+        for name in INDEXED_TAGS:
+            with self.subTest(name=name):
+                self.assertIs(
+                    self.index.find_next(self.jp_header, name),
+                    self.jp_header.find_next(name),
+                )
+
+    def test_tag_name_that_isnt_indexed(self):
+        self.assertNotIn("li", INDEXED_TAGS)
+        li = self.index.find_next(self.jp_header, "li")
+        self.assertIsNotNone(li)
+        self.assertIs(li, self.jp_header.find_next("li"))
+
+    def test_element_that_isnt_indexed(self):
+        li = self.jp_header.find_next("li")
+        self.assertIs(self.index.find_next(li, "ol"), li.find_next("ol"))
+        self.assertIs(self.index.find_next(li, "li"), li.find_next("li"))
+
+    def test_element_before_the_section(self):
+        earlier = self.soup.find("h2")
+        self.assertIsNot(earlier, self.jp_header)
+        self.assertIs(
+            self.index.find_next(earlier, "h2"),
+            self.jp_header,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+"""
+Filename: tests.test_throttling.py
+Author: TravisGK
+Date: 2025-03-22
+
+Description: This file tests that a term whose page is still throttled
+             after every attempt is raised as an error,
+             rather than being taken as a term without a page.
+
+Version: 1.0
+License: MIT
+"""
+
+import unittest
+import requests
+import jplookup
+from jplookup._scrape._fetch.fetchers import Fetcher
+from jplookup._scrape._fetch.http import Page
+
+
+class ThrottledFetcher(Fetcher):
+    """Answers every request with a 429."""
+
+    def __init__(self):
+        self.num_requests = 0
+
+    def fetch(self, term: str) -> Page:
+        self.num_requests += 1
+        return Page(429, "")
+
+
+class ThrottlingTest(unittest.TestCase):
+    def test_scrape_raises_once_attempts_run_out(self):
+        fetcher = ThrottledFetcher()
+        with self.assertRaises(requests.exceptions.HTTPError):
+            jplookup.scrape(
+                "猫",
+                re_sleep_seconds=0,
+                error_sleep_seconds=0,
+                verbose=False,
+                fetcher=fetcher,
+            )
+        self.assertEqual(fetcher.num_requests, 5)
+
+
+if __name__ == "__main__":
+    unittest.main()